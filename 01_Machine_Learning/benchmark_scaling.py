@@ -0,0 +1,209 @@
+import io
+import os
+import json
+import time
+import platform
+import tracemalloc
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+import xgboost
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.cluster import KMeans
+from sklearn.ensemble import RandomForestClassifier
+from xgboost import XGBClassifier, XGBRegressor
+
+from synthetic_data_factory import gerar_em_memoria
+from rfm_engine import rfm_em_streaming, calcular_rfm
+from retail_pipelines import (
+    construir_preprocessor_churn, construir_preprocessor_demanda, construir_preprocessor_propensao,
+    CHURN_TARGET, DEMANDA_TARGET, PROPENSAO_TARGET,
+)
+
+# ==============================================================================
+# 📏 BENCHMARK DE ESCALA (FIT / PREDICT / MEMÓRIA x TAMANHO DA BASE)
+# ==============================================================================
+# Os 4 scripts rodam com tamanhos fixos (10k, 2k, 5k e 10k transações). Aqui cada
+# pipeline roda em tamanhos crescentes e registramos:
+# - tempo de fit (s) e vazão de predict (linhas/s);
+# - pico de memória alocada durante o caso (MB, via tracemalloc: funciona em
+#   Windows, Linux e macOS; alocações internas do XGBoost em C++ ficam de fora);
+# - tamanho do modelo serializado (MB).
+# Cada caso roda num processo NOVO: o pico de memória é só daquele caso, sem herdar o
+# lixo do anterior. O resultado vai para um JSON; se já existir um relatório
+# anterior, os casos que pioraram além da tolerância são apontados.
+
+TAMANHOS = [10_000, 100_000, 1_000_000, 3_000_000]
+PIPELINES = ['churn', 'segmentacao', 'demanda', 'propensao']
+ARQUIVO_RELATORIO = 'benchmark_scaling.json'
+TOLERANCIA_REGRESSAO = 0.25   # 25% mais lento (ou mais pesado) que o relatório anterior = alerta
+
+
+def _tamanho_mb(objeto):
+    buffer = io.BytesIO()
+    joblib.dump(objeto, buffer)
+    return buffer.getbuffer().nbytes / 1024 ** 2
+
+
+def _medir_supervisionado(pipeline, df, coluna_alvo):
+    X = df.drop(columns=coluna_alvo)
+    y = df[coluna_alvo]
+
+    inicio = time.perf_counter()
+    pipeline.fit(X, y)
+    tempo_fit = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    pipeline.predict(X)
+    tempo_predict = time.perf_counter() - inicio
+    return tempo_fit, len(X) / tempo_predict, _tamanho_mb(pipeline)
+
+
+def _caso_churn(n_linhas):
+    # Mesmo modelo do churn_prediction_xgboost.py
+    pipeline = Pipeline(steps=[
+        ('preprocessor', construir_preprocessor_churn()),
+        ('classifier', XGBClassifier(n_estimators=100, learning_rate=0.1, scale_pos_weight=5, random_state=42))
+    ])
+    df = gerar_em_memoria('churn', n_linhas).drop(columns='id_cliente')
+    return _medir_supervisionado(pipeline, df, CHURN_TARGET)
+
+
+def _caso_demanda(n_linhas):
+    # XGBoost do torneio de regressão (melhor combinação típica do grid)
+    pipeline = Pipeline(steps=[
+        ('preprocessor', construir_preprocessor_demanda()),
+        ('regressor', XGBRegressor(n_estimators=100, learning_rate=0.1, random_state=42))
+    ])
+    return _medir_supervisionado(pipeline, gerar_em_memoria('demanda', n_linhas), DEMANDA_TARGET)
+
+
+def _caso_propensao(n_linhas):
+    # Random Forest do sales_propensity_model.py (maior combinação do grid)
+    pipeline = Pipeline(steps=[
+        ('preprocessor', construir_preprocessor_propensao()),
+        ('classifier', RandomForestClassifier(n_estimators=100, max_depth=10, random_state=42))
+    ])
+    df = gerar_em_memoria('propensao', n_linhas).drop(columns='id_cliente')
+    return _medir_supervisionado(pipeline, df, PROPENSAO_TARGET)
+
+
+def _caso_segmentacao(n_linhas):
+    # n_linhas = transações. O "fit" inclui o RFM (agregação) + scaler + KMeans(4),
+    # como no customer_segmentation_kmeans.py; o predict atribui segmento a cada cliente.
+    transacoes = gerar_em_memoria('transacoes', n_linhas)
+
+    inicio = time.perf_counter()
+    rfm = calcular_rfm(rfm_em_streaming([transacoes]))
+    scaler = StandardScaler()
+    rfm_scaled = scaler.fit_transform(rfm)
+    modelo = KMeans(n_clusters=4, random_state=42, n_init=10).fit(rfm_scaled)
+    tempo_fit = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    modelo.predict(scaler.transform(rfm))
+    tempo_predict = time.perf_counter() - inicio
+    return tempo_fit, len(rfm) / tempo_predict, _tamanho_mb((scaler, modelo))
+
+
+CASOS = {
+    'churn': _caso_churn,
+    'segmentacao': _caso_segmentacao,
+    'demanda': _caso_demanda,
+    'propensao': _caso_propensao,
+}
+
+
+def _rodar_caso(nome, n_linhas):
+    # Roda dentro do processo filho (rastreamento ligado só durante o caso)
+    tracemalloc.start()
+    try:
+        tempo_fit, vazao_predict, tamanho_modelo = CASOS[nome](n_linhas)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'pipeline': nome,
+        'n_linhas': n_linhas,
+        'tempo_fit_s': tempo_fit,
+        'predict_linhas_por_s': vazao_predict,
+        'pico_memoria_mb': pico / 1024 ** 2,
+        'tamanho_modelo_mb': tamanho_modelo,
+    }
+
+
+def rodar_benchmark(pipelines=PIPELINES, tamanhos=TAMANHOS):
+    contexto = multiprocessing.get_context('spawn')
+    resultados = []
+    for nome in pipelines:
+        for n_linhas in tamanhos:
+            # Um processo novo por caso (spawn: nada herdado do processo pai)
+            with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as executor:
+                resultado = executor.submit(_rodar_caso, nome, n_linhas).result()
+            print(f"{nome:<12} | {n_linhas:>10,} linhas | fit {resultado['tempo_fit_s']:8.2f}s | "
+                  f"predict {resultado['predict_linhas_por_s']:>12,.0f} linhas/s | "
+                  f"pico {resultado['pico_memoria_mb']:8.0f} MB | modelo {resultado['tamanho_modelo_mb']:7.2f} MB")
+            resultados.append(resultado)
+
+    return {
+        'gerado_em': datetime.now().isoformat(timespec='seconds'),
+        'ambiente': {
+            'python': platform.python_version(),
+            'sistema': platform.platform(),
+            'cpus': os.cpu_count(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'sklearn': sklearn.__version__,
+            'xgboost': xgboost.__version__,
+        },
+        'resultados': resultados,
+    }
+
+
+def comparar_com_anterior(relatorio, anterior, tolerancia=TOLERANCIA_REGRESSAO):
+    # Compara caso a caso (mesmo pipeline e tamanho). Mais lento no fit, menos
+    # linhas/s no predict ou mais memória além da tolerância = regressão.
+    base = {(r['pipeline'], r['n_linhas']): r for r in anterior['resultados']}
+    regressoes = []
+    for atual in relatorio['resultados']:
+        antigo = base.get((atual['pipeline'], atual['n_linhas']))
+        if antigo is None:
+            continue
+        variacoes = {
+            'tempo_fit_s': atual['tempo_fit_s'] / antigo['tempo_fit_s'] - 1,
+            'predict_linhas_por_s': antigo['predict_linhas_por_s'] / atual['predict_linhas_por_s'] - 1,
+        }
+        if 'pico_memoria_mb' in antigo:   # Relatórios antigos mediam RSS: não dá para comparar
+            variacoes['pico_memoria_mb'] = atual['pico_memoria_mb'] / antigo['pico_memoria_mb'] - 1
+        for metrica, piora in variacoes.items():
+            if piora > tolerancia:
+                regressoes.append({'pipeline': atual['pipeline'], 'n_linhas': atual['n_linhas'],
+                                   'metrica': metrica, 'piora': piora})
+    return regressoes
+
+
+if __name__ == "__main__":
+    print("📏 BENCHMARK DE ESCALA DOS MODELOS")
+    print("-" * 110)
+    relatorio = rodar_benchmark()
+
+    if os.path.exists(ARQUIVO_RELATORIO):
+        with open(ARQUIVO_RELATORIO) as arquivo:
+            anterior = json.load(arquivo)
+        regressoes = comparar_com_anterior(relatorio, anterior)
+        relatorio['regressoes_vs_anterior'] = regressoes
+        print(f"\n🔎 Comparação com o relatório de {anterior['gerado_em']}:")
+        if not regressoes:
+            print(f"   ✅ Nenhum caso piorou mais de {TOLERANCIA_REGRESSAO:.0%}")
+        for r in regressoes:
+            print(f"   🚨 {r['pipeline']} ({r['n_linhas']:,} linhas): {r['metrica']} piorou {r['piora']:.0%}")
+
+    with open(ARQUIVO_RELATORIO, 'w') as arquivo:
+        json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+    print(f"\n💾 Relatório salvo em {ARQUIVO_RELATORIO}")
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+# ==============================================================================
+# 🎲 SIMULADOR DE ROI POR MONTE CARLO (MILHARES DE CENÁRIOS DE UMA VEZ)
+# ==============================================================================
+# A seção de ROI do sales_propensity_model.py faz duas contas pontuais (SMS a R$ 5
+# e catálogo a R$ 50). Mas o resultado do teste é UMA amostra: com outros 1000
+# clientes o lucro seria outro. Aqui:
+# 1. Bootstrap do conjunto de teste (reamostragem com reposição) B vezes;
+# 2. Para cada reamostra, o lucro do "Massivo" e da "IA" em uma grade de
+#    custo de contato x lucro por venda x corte de probabilidade;
+# 3. Saem média, intervalo de confiança e a chance de a IA ganhar do Massivo.
+#
+# Truque para não reamostrar linha a linha: lucro e custo só dependem de QUANTOS
+# clientes caem em cada célula (faixa de probabilidade entre os cortes x comprou
+# ou não). Reamostrar n linhas com reposição = sortear uma multinomial sobre essas
+# células. B reamostras de uma base de milhões viram uma matriz (B x células).
+
+N_REAMOSTRAS = 5_000
+NIVEL_CONFIANCA = 0.95
+SEMENTE = 42
+
+
+def contar_celulas(y_real, y_proba, limiares):
+    # Faixa k = quantos cortes ficam abaixo da probabilidade: o cliente é
+    # contatado no corte j (regra y_proba > limiar, igual ao script) se k > j.
+    limiares = np.sort(np.asarray(limiares, dtype=np.float64))
+    faixa = np.searchsorted(limiares, np.asarray(y_proba, dtype=np.float64), side='left')
+    celula = faixa * 2 + np.asarray(y_real, dtype=np.int64)
+    return limiares, np.bincount(celula, minlength=2 * (len(limiares) + 1))
+
+
+def simular_roi(y_real, y_proba, custos_contato, lucros_venda, limiares=(0.5,),
+                n_reamostras=N_REAMOSTRAS, nivel_confianca=NIVEL_CONFIANCA, semente=SEMENTE):
+    limiares, contagens = contar_celulas(y_real, y_proba, limiares)
+    n = int(contagens.sum())
+    rng = np.random.default_rng(semente)
+
+    # (B x faixas x [não comprou, comprou])
+    amostras = rng.multinomial(n, contagens / n, size=n_reamostras).reshape(n_reamostras, -1, 2)
+
+    # Contatados/compradores no corte j = soma das faixas ACIMA de j (soma acumulada reversa)
+    acima = np.cumsum(amostras[:, ::-1, :], axis=1)[:, ::-1, :][:, 1:, :]   # (B x cortes x 2)
+    contatados_ia = acima.sum(axis=2)
+    compradores_ia = acima[:, :, 1]
+    compradores_total = amostras[:, :, 1].sum(axis=1)
+
+    # Grade inteira por broadcasting: (B x cortes x custos x lucros)
+    custos = np.asarray(custos_contato, dtype=np.float64)[None, None, :, None]
+    lucros = np.asarray(lucros_venda, dtype=np.float64)[None, None, None, :]
+    gasto_ia = contatados_ia[:, :, None, None] * custos
+    lucro_ia = compradores_ia[:, :, None, None] * lucros - gasto_ia
+    gasto_massivo = n * custos
+    lucro_massivo = compradores_total[:, None, None, None] * lucros - gasto_massivo
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        roi_ia = np.where(gasto_ia > 0, lucro_ia / gasto_ia, np.nan)
+    roi_massivo = lucro_massivo / gasto_massivo
+
+    alfa = (1 - nivel_confianca) / 2
+    quantis = [alfa, 1 - alfa]
+    # Massivo não depende do corte: repete ao longo do eixo dos cortes
+    lucro_massivo = np.broadcast_to(lucro_massivo, lucro_ia.shape)
+    roi_massivo = np.broadcast_to(roi_massivo, lucro_ia.shape)
+
+    grade = pd.MultiIndex.from_product([limiares, custos.ravel(), lucros.ravel()],
+                                       names=['limiar', 'custo_contato', 'lucro_venda'])
+    colunas = {}
+    for nome, valores in [('lucro_ia', lucro_ia), ('roi_ia', roi_ia),
+                          ('lucro_massivo', lucro_massivo), ('roi_massivo', roi_massivo)]:
+        inf, sup = np.nanquantile(valores, quantis, axis=0)
+        colunas[f'{nome}_medio'] = np.nanmean(valores, axis=0).ravel()
+        colunas[f'{nome}_ic_inf'] = inf.ravel()
+        colunas[f'{nome}_ic_sup'] = sup.ravel()
+    colunas['prob_ia_vence'] = (lucro_ia > lucro_massivo).mean(axis=0).ravel()
+    return pd.DataFrame(colunas, index=grade).reset_index()
+
+
+if __name__ == "__main__":
+    # Benchmark: base pontuada de 10 milhões de leads, grade de 5 x 5 x 9 cenários
+    import time
+
+    rng = np.random.default_rng(42)
+    n = 10_000_000
+    proba = rng.beta(2, 3, n)
+    comprou = rng.random(n) < proba
+
+    inicio = time.perf_counter()
+    resultado = simular_roi(comprou, proba, custos_contato=[1, 5, 10, 20, 50],
+                            lucros_venda=[50, 100, 150, 200, 300], limiares=np.arange(0.1, 1.0, 0.1))
+    print(f"{n:,} leads | {len(resultado)} cenários x {N_REAMOSTRAS:,} reamostras em "
+          f"{time.perf_counter() - inicio:.2f}s")
+
+    # Conferência com o bootstrap "ingênuo" (reamostrando linhas) num cenário, base menor
+    m, b = 20_000, 300
+    ids = rng.integers(0, m, (b, m))
+    lucros_ingenuos = [(comprou[:m][i][proba[:m][i] > 0.5].sum() * 150 - (proba[:m][i] > 0.5).sum() * 50) for i in ids]
+    cenario = simular_roi(comprou[:m], proba[:m], [50], [150], [0.5], n_reamostras=b)
+    print(f"Lucro IA (corte 0.5, R$ 50 x R$ 150): multinomial média {cenario['lucro_ia_medio'].iloc[0]:,.0f} | "
+          f"bootstrap por linhas média {np.mean(lucros_ingenuos):,.0f}")
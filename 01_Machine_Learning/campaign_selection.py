@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+
+# ==============================================================================
+# 🎯 SELEÇÃO DE LEADS COM ORÇAMENTO FIXO (TOP-K EM STREAMING)
+# ==============================================================================
+# O sales_propensity_model.py escolhe quem recebe o catálogo com y_proba > 0.5.
+# Campanha de verdade tem verba fechada: dá para mandar N = orçamento / custo
+# catálogos, nem um a mais. Então a pergunta certa é: QUAIS N leads dão o maior
+# lucro esperado?
+#   lucro_esperado(lead) = prob_compra * lucro_venda - custo_contato
+# Só entra quem tem lucro esperado positivo, e no máximo N leads. Contato de
+# custo zero (e-mail, push) não gasta verba: entram TODOS os de lucro positivo.
+#
+# A base pontuada chega em chunks (nunca inteira na memória). Guardamos só os
+# N melhores até agora: a cada chunk, junta "melhores + chunk" e o np.argpartition
+# corta de volta para N (seleção em O(n), sem ordenar a base). Só os N finais
+# são ordenados, no fim.
+
+COLUNA_ID = 'id_cliente'
+COLUNA_PROB = 'Prob_Compra'
+TAMANHO_CHUNK = 200_000
+
+
+def pontuar_em_chunks(pipeline, df, tamanho_chunk=TAMANHO_CHUNK, coluna_id=COLUNA_ID):
+    # Atalho para bases em memória: entrega (id, probabilidade) chunk a chunk.
+    # Para bases em disco, use o ler_em_chunks do churn_batch_scoring.py.
+    for inicio in range(0, len(df), tamanho_chunk):
+        chunk = df.iloc[inicio:inicio + tamanho_chunk]
+        yield pd.DataFrame({
+            coluna_id: chunk[coluna_id].to_numpy(),
+            COLUNA_PROB: pipeline.predict_proba(chunk.drop(columns=coluna_id))[:, 1],
+        })
+
+
+def _top_k(ids, lucros, k):
+    # Mantém os k maiores lucros (sem ordem entre eles)
+    if k == 0:
+        return ids[:0], lucros[:0]   # Verba não paga nem um contato
+    if len(lucros) <= k:
+        return ids, lucros
+    manter = np.argpartition(lucros, len(lucros) - k)[-k:]
+    return ids[manter], lucros[manter]
+
+
+def selecionar_leads(chunks_pontuados, orcamento, custo_contato, lucro_venda,
+                     coluna_id=COLUNA_ID, coluna_prob=COLUNA_PROB):
+    # chunks_pontuados: iterável de DataFrames com id + probabilidade de compra
+    if custo_contato < 0:
+        raise ValueError(f"custo_contato não pode ser negativo (recebido {custo_contato})")
+    k = int(orcamento // custo_contato) if custo_contato > 0 else None   # Custo zero: a verba não limita
+    partes_ids = [np.empty(0, dtype=np.int64)]
+    partes_lucros = [np.empty(0, dtype=np.float64)]
+    n_lidos = 0
+
+    for chunk in chunks_pontuados:
+        n_lidos += len(chunk)
+        lucros = chunk[coluna_prob].to_numpy(dtype=np.float64) * lucro_venda - custo_contato
+        positivos = lucros > 0                      # Lead que dá prejuízo esperado nem concorre
+        partes_ids.append(chunk[coluna_id].to_numpy()[positivos])
+        partes_lucros.append(lucros[positivos])
+        if k is not None:                           # Com verba: corta de volta para os K melhores
+            melhores_ids, melhores_lucros = _top_k(np.concatenate(partes_ids), np.concatenate(partes_lucros), k)
+            partes_ids, partes_lucros = [melhores_ids], [melhores_lucros]
+
+    # Sem limite, as partes são juntadas uma vez só (sem recopiar a cada chunk)
+    melhores_ids, melhores_lucros = np.concatenate(partes_ids), np.concatenate(partes_lucros)
+
+    # Só os K escolhidos são ordenados (lista de disparo do melhor para o pior)
+    ordem = np.argsort(-melhores_lucros, kind='stable')
+    selecionados = pd.DataFrame({
+        coluna_id: melhores_ids[ordem],
+        'lucro_esperado': melhores_lucros[ordem],
+    })
+    selecionados[coluna_prob] = (selecionados['lucro_esperado'] + custo_contato) / lucro_venda
+
+    custo_total = len(selecionados) * custo_contato
+    lucro_esperado = float(selecionados['lucro_esperado'].sum())
+    resumo = {
+        'leads_avaliados': n_lidos,
+        'limite_orcamento': k,                      # None = sem limite (custo zero)
+        'leads_selecionados': len(selecionados),
+        'custo_total': custo_total,
+        'receita_esperada': lucro_esperado + custo_total,
+        'lucro_esperado': lucro_esperado,
+        'roi_esperado': lucro_esperado / custo_total if custo_total else 0.0,
+    }
+    return selecionados, resumo
+
+
+if __name__ == "__main__":
+    # Benchmark: top-K em streaming x ordenar a base inteira (mesmos leads?)
+    import time
+
+    rng = np.random.default_rng(42)
+    n, tamanho = 20_000_000, 1_000_000
+    probs = rng.beta(2, 5, n)
+    ids = np.arange(1, n + 1)
+    orcamento, custo, lucro = 500_000.0, 50.0, 150.0
+
+    def chunks():
+        for inicio in range(0, n, tamanho):
+            yield pd.DataFrame({COLUNA_ID: ids[inicio:inicio + tamanho], COLUNA_PROB: probs[inicio:inicio + tamanho]})
+
+    inicio = time.perf_counter()
+    selecionados, resumo = selecionar_leads(chunks(), orcamento, custo, lucro)
+    tempo_stream = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    lucros = probs * lucro - custo
+    ordem = np.argsort(-lucros, kind='stable')[:int(orcamento // custo)]
+    esperado = ordem[lucros[ordem] > 0]
+    tempo_sort = time.perf_counter() - inicio
+
+    iguais = set(selecionados[COLUNA_ID]) == set(ids[esperado])
+    print(f"{n:,} leads | streaming top-K: {tempo_stream:.2f}s | sort completo: {tempo_sort:.2f}s | "
+          f"mesmos leads: {iguais}")
+    print({chave: round(valor, 2) for chave, valor in resumo.items()})
+
+    # Verba menor que um contato: nenhum lead, sem erro
+    vazio, resumo_vazio = selecionar_leads(chunks(), orcamento=custo - 1, custo_contato=custo, lucro_venda=lucro)
+    print(f"Verba de R$ {custo - 1:.2f} (< 1 contato): {len(vazio)} leads selecionados, "
+          f"custo R$ {resumo_vazio['custo_total']:.2f}")
+
+    # Contato de custo zero: a verba não limita, entra todo lead com lucro esperado positivo
+    gratis, resumo_gratis = selecionar_leads(chunks(), orcamento, custo_contato=0.0, lucro_venda=lucro)
+    print(f"Contato grátis: {len(gratis):,} leads selecionados "
+          f"(todos com probabilidade > 0: {len(gratis) == int((probs > 0).sum())})")
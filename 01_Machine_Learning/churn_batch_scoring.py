@@ -0,0 +1,137 @@
+import os
+import functools
+import joblib
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from joblib import Parallel, delayed
+
+from retail_pipelines import CHURN_NUMERIC_FEATURES
+
+# ==============================================================================
+# ⚙️ CONFIGURAÇÃO DO SCORING EM LOTE (RODADA NOTURNA)
+# ==============================================================================
+# O modelo é salvo pelo churn_prediction_xgboost.py. Aqui só carregamos e pontuamos.
+ARQUIVO_MODELO = 'modelo_churn_xgboost.joblib'
+ARQUIVO_ENTRADA = 'base_clientes.parquet'      # Aceita .csv ou .parquet
+ARQUIVO_SAIDA = 'base_clientes_scores.parquet' # Aceita .csv ou .parquet
+TAMANHO_CHUNK = 200_000                        # Linhas por pedaço (controla a RAM)
+N_JOBS = -1                                    # Usa todos os núcleos
+
+COLUNA_ID = 'id_cliente'
+COLUNA_SCORE = 'Risco_Churn_Prob'
+
+# Tipos FIXOS na leitura do CSV: sem isso o pandas infere chunk a chunk, e um chunk
+# com categoria_favorita toda vazia viraria float64 em vez de texto
+TIPOS_CSV = {
+    **{coluna: np.float64 for coluna in CHURN_NUMERIC_FEATURES},   # float aceita nulo em qualquer chunk
+    'categoria_favorita': object,
+    'usou_sac_recente': np.float64,                                 # Flag 0/1 (1.0 == 1 no OneHotEncoder)
+}
+
+
+# ==============================================================================
+# 1. PERSISTÊNCIA DO MODELO
+# ==============================================================================
+def salvar_pipeline(pipeline, caminho=ARQUIVO_MODELO):
+    # O Pipeline inteiro (pré-processamento + XGBoost) vai num arquivo só.
+    # Assim a produção aplica EXATAMENTE a mesma transformação do treino.
+    joblib.dump(pipeline, caminho)
+    return caminho
+
+
+@functools.lru_cache(maxsize=4)
+def _carregar_versao(caminho, mtime_ns, tamanho):
+    # mtime/tamanho só entram na chave do cache: arquivo sobrescrito = versão nova
+    return joblib.load(caminho)
+
+
+def carregar_pipeline(caminho=ARQUIVO_MODELO):
+    # Cache por processo: cada worker lê o modelo do disco UMA vez só,
+    # em vez de receber o pipeline serializado a cada chunk. Os workers do loky
+    # são reaproveitados entre execuções: se o modelo for retreinado e salvo no
+    # mesmo caminho, a chave muda e o worker relê o arquivo (nada de score velho).
+    info = os.stat(caminho)
+    return _carregar_versao(caminho, info.st_mtime_ns, info.st_size)
+
+
+# ==============================================================================
+# 2. LEITURA EM STREAMING (NUNCA A BASE INTEIRA NA MEMÓRIA)
+# ==============================================================================
+def ler_em_chunks(caminho, tamanho_chunk=TAMANHO_CHUNK, tipos=TIPOS_CSV):
+    # Gerador: entrega um DataFrame de cada vez, do tamanho do chunk.
+    # Parquet já traz o tipo de cada coluna no schema; no CSV ele vem de 'tipos'.
+    if caminho.endswith('.parquet'):
+        arquivo = pq.ParquetFile(caminho)
+        for lote in arquivo.iter_batches(batch_size=tamanho_chunk):
+            yield lote.to_pandas()
+    else:
+        for chunk in pd.read_csv(caminho, chunksize=tamanho_chunk, dtype=tipos):
+            yield chunk
+
+
+def _pontuar_chunk(caminho_modelo, chunk):
+    # Roda dentro do worker: carrega (do cache) e pontua só este pedaço
+    pipeline = carregar_pipeline(caminho_modelo)
+    features = chunk.drop(columns=[COLUNA_ID, 'churn'], errors='ignore')
+    return pd.DataFrame({
+        COLUNA_ID: chunk[COLUNA_ID].to_numpy(),
+        COLUNA_SCORE: pipeline.predict_proba(features)[:, 1].astype(np.float32)
+    })
+
+
+# ==============================================================================
+# 3. ESCRITA INCREMENTAL (CADA CHUNK PONTUADO JÁ VAI PARA O DISCO)
+# ==============================================================================
+class _EscritorIncremental:
+    # Abstrai o "append" para CSV e Parquet (o Parquet precisa de um writer aberto)
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.writer = None
+        self.primeiro = True
+
+    def escrever(self, df):
+        if self.caminho.endswith('.parquet'):
+            tabela = pa.Table.from_pandas(df, preserve_index=False)
+            if self.writer is None:
+                self.writer = pq.ParquetWriter(self.caminho, tabela.schema)
+            self.writer.write_table(tabela)
+        else:
+            df.to_csv(self.caminho, mode='w' if self.primeiro else 'a', header=self.primeiro, index=False)
+        self.primeiro = False
+
+    def fechar(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def pontuar_base_em_lotes(caminho_entrada=ARQUIVO_ENTRADA, caminho_saida=ARQUIVO_SAIDA,
+                          caminho_modelo=ARQUIVO_MODELO, tamanho_chunk=TAMANHO_CHUNK, n_jobs=N_JOBS):
+    # O joblib consome o gerador aos poucos (pre_dispatch) e devolve os resultados
+    # em ordem, conforme ficam prontos. No máximo ~2 chunks por núcleo ficam na RAM.
+    paralelo = Parallel(n_jobs=n_jobs, return_as='generator', pre_dispatch='2*n_jobs')
+    tarefas = (delayed(_pontuar_chunk)(caminho_modelo, chunk)
+               for chunk in ler_em_chunks(caminho_entrada, tamanho_chunk))
+
+    escritor = _EscritorIncremental(caminho_saida)
+    total = 0
+    try:
+        for resultado in paralelo(tarefas):
+            escritor.escrever(resultado)
+            total += len(resultado)
+            print(f"⚡ Clientes pontuados: {total:,}", end='\r')
+    finally:
+        escritor.fechar()
+
+    print(f"\n✅ Scoring concluído: {total:,} clientes gravados em '{caminho_saida}'")
+    return total
+
+
+if __name__ == "__main__":
+    if not os.path.exists(ARQUIVO_MODELO):
+        print(f"⚠️ Modelo '{ARQUIVO_MODELO}' não encontrado. Rode antes o churn_prediction_xgboost.py!")
+    elif not os.path.exists(ARQUIVO_ENTRADA):
+        print(f"⚠️ Base '{ARQUIVO_ENTRADA}' não encontrada.")
+    else:
+        pontuar_base_em_lotes()
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from joblib import Parallel, delayed
+
+# ==============================================================================
+# 🔎 POR QUE ESSE CLIENTE ESTÁ EM RISCO? (TREESHAP EM LOTE)
+# ==============================================================================
+# O próprio XGBoost calcula as contribuições SHAP exatas das árvores
+# (pred_contribs=True), sem biblioteca extra. Só que elas saem por coluna
+# TRANSFORMADA (ex: categoria_favorita_Pet, categoria_favorita_Moda...).
+# Somamos as colunas do one-hot de volta na feature original, para o agente
+# de retenção ler "categoria_favorita" e não "cat__categoria_favorita_Pet".
+# Guardamos só os 3 maiores motivos por cliente: ids int16 + valores float32.
+# Motivo de risco = contribuição POSITIVA (empurra a probabilidade de churn para
+# cima). Se o cliente tem menos de 3, as vagas que sobram ficam vazias (id -1).
+
+TOP_MOTIVOS = 3
+TAMANHO_CHUNK = 100_000
+
+
+def construir_mapa_features(preprocessor):
+    # Matriz (colunas transformadas x features originais) com 1 onde a coluna pertence à feature
+    if not hasattr(preprocessor, 'transformers_'):
+        # Caminho nativo (TiposCompactos do dtype_optimizer.py): sem one-hot, 1 coluna por feature
+        nomes = list(preprocessor.get_feature_names_out())
+        return np.eye(len(nomes), dtype=np.float32), nomes
+
+    nomes_originais = []
+    blocos = []
+    for nome, transformador, colunas in preprocessor.transformers_:
+        if nome == 'remainder':
+            continue
+        onehot = transformador.named_steps.get('onehot') if hasattr(transformador, 'named_steps') else None
+        for i, coluna in enumerate(colunas):
+            tamanho = len(onehot.categories_[i]) if onehot is not None else 1
+            blocos.append((len(nomes_originais), tamanho))
+            nomes_originais.append(coluna)
+
+    n_transformadas = sum(tamanho for _, tamanho in blocos)
+    mapa = np.zeros((n_transformadas, len(nomes_originais)), dtype=np.float32)
+    linha = 0
+    for indice_original, tamanho in blocos:
+        mapa[linha:linha + tamanho, indice_original] = 1.0
+        linha += tamanho
+    return mapa, nomes_originais
+
+
+def _explicar_chunk(preprocessor, booster, mapa, chunk, top_k):
+    booster = booster.copy()
+    booster.set_param({'nthread': 1})  # O paralelismo já vem dos processos do joblib
+    X = preprocessor.transform(chunk)
+    contribuicoes = booster.predict(xgb.DMatrix(X, enable_categorical=True),
+                                    pred_contribs=True)[:, :-1]  # Última coluna = viés
+    por_feature = contribuicoes @ mapa
+    # Quem reduz o risco (contribuição <= 0) não concorre a "motivo"
+    por_feature = np.where(por_feature > 0, por_feature, -np.inf)
+
+    # argpartition acha os top-k sem ordenar tudo; depois ordena só esses k
+    top = np.argpartition(-por_feature, top_k - 1, axis=1)[:, :top_k]
+    valores = np.take_along_axis(por_feature, top, axis=1)
+    ordem = np.argsort(-valores, axis=1)
+    ids = np.take_along_axis(top, ordem, axis=1).astype(np.int16)
+    valores = np.take_along_axis(valores, ordem, axis=1)
+
+    vazio = np.isneginf(valores)
+    ids[vazio] = -1
+    valores[vazio] = np.nan
+    return ids, valores.astype(np.float32)
+
+
+def explicar_em_lotes(pipeline, X, top_k=TOP_MOTIVOS, tamanho_chunk=TAMANHO_CHUNK, n_jobs=-1):
+    # X: DataFrame com as features originais (ex: a população sinalizada como alto risco)
+    preprocessor = pipeline.named_steps['preprocessor']
+    booster = pipeline.named_steps['classifier'].get_booster()
+    mapa, nomes = construir_mapa_features(preprocessor)
+    top_k = min(top_k, len(nomes))
+
+    resultados = Parallel(n_jobs=n_jobs)(
+        delayed(_explicar_chunk)(preprocessor, booster, mapa, X.iloc[inicio:inicio + tamanho_chunk], top_k)
+        for inicio in range(0, len(X), tamanho_chunk)
+    )
+    if not resultados:
+        return {'ids': np.empty((0, top_k), np.int16), 'valores': np.empty((0, top_k), np.float32),
+                'nomes_features': nomes, 'index': X.index}
+    return {
+        'ids': np.concatenate([ids for ids, _ in resultados]),
+        'valores': np.concatenate([valores for _, valores in resultados]),
+        'nomes_features': nomes,
+        'index': X.index,
+    }
+
+
+def explicacoes_para_dataframe(explicacoes):
+    # Versão legível (para relatório / CRM): Motivo_1 = "total_gasto_ultimo_ano (+1.23)"
+    # Vaga sem motivo de risco (id -1) sai como texto vazio
+    nomes = np.array(explicacoes['nomes_features'], dtype=object)
+    tabela = {}
+    for j in range(explicacoes['ids'].shape[1]):
+        ids = explicacoes['ids'][:, j]
+        valores = explicacoes['valores'][:, j]
+        tabela[f'Motivo_{j + 1}'] = [f"{nomes[i]} ({v:+.2f})" if i >= 0 else ""
+                                     for i, v in zip(ids, valores)]
+    return pd.DataFrame(tabela, index=explicacoes['index'])
@@ -0,0 +1,98 @@
+import time
+import numpy as np
+
+# ==============================================================================
+# ⚡ SCORING DE BAIXA LATÊNCIA (CLIENTE NA LINHA DO SAC)
+# ==============================================================================
+# O predict_proba do Pipeline gasta quase todo o tempo no "despacho" do sklearn
+# (ColumnTransformer, validações, DataFrame de 1 linha) e não nas árvores.
+# Aqui "compilamos" o Pipeline treinado: extraímos medianas, médias/desvios do
+# scaler e o mapa do one-hot para arrays NumPy e chamamos o Booster direto.
+
+
+def compilar_scorer(pipeline):
+    preprocessor = pipeline.named_steps['preprocessor']
+    classifier = pipeline.named_steps['classifier']
+
+    # Lê o ColumnTransformer já treinado (ordem das colunas = ordem da saída)
+    transformadores = {nome: (trans, colunas) for nome, trans, colunas in preprocessor.transformers_}
+    num_pipe, numeric_features = transformadores['num']
+    cat_pipe, categorical_features = transformadores['cat']
+
+    imputer_num = num_pipe.named_steps['imputer']
+    scaler = num_pipe.named_steps['scaler']
+    imputer_cat = cat_pipe.named_steps['imputer']
+    onehot = cat_pipe.named_steps['onehot']
+
+    # Mapa categoria -> posição no vetor final (categorias desconhecidas ficam todas em zero,
+    # igual ao handle_unknown='ignore' do OneHotEncoder)
+    n_num = len(numeric_features)
+    mapas_onehot = []
+    deslocamento = n_num
+    for categorias in onehot.categories_:
+        mapas_onehot.append({cat: deslocamento + i for i, cat in enumerate(categorias)})
+        deslocamento += len(categorias)
+
+    return {
+        'numeric_features': list(numeric_features),
+        'categorical_features': list(categorical_features),
+        'medianas': imputer_num.statistics_.astype(np.float64),
+        'media': scaler.mean_.astype(np.float64),
+        'escala': scaler.scale_.astype(np.float64),
+        'valor_nulo_cat': imputer_cat.fill_value,
+        'mapas_onehot': mapas_onehot,
+        'n_colunas': deslocamento,
+        'booster': classifier.get_booster(),
+    }
+
+
+def _eh_nulo(valor):
+    return valor is None or (isinstance(valor, float) and valor != valor)
+
+
+def vetorizar_cliente(scorer, cliente):
+    # cliente: dict {coluna: valor}. Monta a linha plana já pré-processada.
+    linha = np.zeros((1, scorer['n_colunas']), dtype=np.float32)
+
+    numericos = np.array([cliente.get(c, np.nan) for c in scorer['numeric_features']], dtype=np.float64)
+    nulos = np.isnan(numericos)
+    numericos[nulos] = scorer['medianas'][nulos]
+    linha[0, :len(numericos)] = (numericos - scorer['media']) / scorer['escala']
+
+    for coluna, mapa in zip(scorer['categorical_features'], scorer['mapas_onehot']):
+        valor = cliente.get(coluna)
+        if _eh_nulo(valor):
+            valor = scorer['valor_nulo_cat']
+        posicao = mapa.get(valor)
+        if posicao is not None:
+            linha[0, posicao] = 1.0
+    return linha
+
+
+def pontuar_cliente(scorer, cliente):
+    # inplace_predict pula a criação de DMatrix: é o caminho mais curto até as árvores
+    linha = vetorizar_cliente(scorer, cliente)
+    return float(scorer['booster'].inplace_predict(linha)[0])
+
+
+# ==============================================================================
+# 🧪 PARIDADE E LATÊNCIA (O ATALHO TEM QUE DAR O MESMO RESULTADO)
+# ==============================================================================
+def validar_paridade(scorer, pipeline, X, tolerancia=1e-5):
+    esperado = pipeline.predict_proba(X)[:, 1]
+    obtido = np.array([pontuar_cliente(scorer, cliente) for cliente in X.to_dict('records')])
+    diferenca_max = float(np.max(np.abs(esperado - obtido)))
+    if diferenca_max > tolerancia:
+        raise AssertionError(f"Scorer compilado divergiu do Pipeline: diferença máxima {diferenca_max:.2e}")
+    return diferenca_max
+
+
+def medir_latencia(funcao, clientes, repeticoes=1):
+    tempos = []
+    for _ in range(repeticoes):
+        for cliente in clientes:
+            inicio = time.perf_counter()
+            funcao(cliente)
+            tempos.append(time.perf_counter() - inicio)
+    tempos_ms = np.array(tempos) * 1000
+    return {'p50_ms': float(np.percentile(tempos_ms, 50)), 'p99_ms': float(np.percentile(tempos_ms, 99))}
@@ -0,0 +1,187 @@
+import time
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.pipeline import Pipeline
+from sklearn.metrics import roc_auc_score
+from xgboost import XGBClassifier
+
+from retail_pipelines import construir_preprocessor_churn, CHURN_NUMERIC_FEATURES, CHURN_TARGET
+from synthetic_data_factory import gerar_chunk_churn
+
+# ==============================================================================
+# 🔁 RETREINO DIÁRIO INCREMENTAL DO CHURN (SÓ O DELTA DO DIA)
+# ==============================================================================
+# Retreinar do zero com o histórico inteiro fica mais caro a cada dia.
+# Aqui o XGBoost CONTINUA o boosting do booster de ontem (xgb_model=) usando só
+# os clientes novos/alterados do dia. As estatísticas do pré-processamento
+# (mediana e média/variância) são mantidas por um estado "somável":
+# o estado de ontem + o estado do delta = o estado da base inteira, sem reler nada.
+
+N_BINS_MEDIANA = 2048      # Resolução do histograma usado na mediana aproximada
+RODADAS_POR_DIA = 20       # Árvores novas adicionadas a cada retreino incremental
+
+PARAMS_CLASSIFIER = {'n_estimators': 100, 'learning_rate': 0.1, 'scale_pos_weight': 5, 'random_state': 42}
+
+
+# ==============================================================================
+# 1. ESTATÍSTICAS SOMÁVEIS (MÉDIA/VARIÂNCIA + HISTOGRAMA PARA MEDIANA)
+# ==============================================================================
+def criar_estatisticas(df, colunas=CHURN_NUMERIC_FEATURES, bordas=None):
+    # bordas: grade fixa do histograma. Na primeira carga sai dos dados; depois é
+    # reaproveitada, pois histogramas só podem ser somados se tiverem a mesma grade.
+    valores = df[colunas].to_numpy(dtype=np.float64)
+    if bordas is None:
+        minimo, maximo = np.nanmin(valores, axis=0), np.nanmax(valores, axis=0)
+        bordas = [np.linspace(lo, hi, N_BINS_MEDIANA + 1) for lo, hi in zip(minimo, maximo)]
+
+    contagem = np.sum(~np.isnan(valores), axis=0).astype(np.float64)
+    media = np.where(contagem > 0, np.nansum(valores, axis=0) / np.maximum(contagem, 1), 0.0)
+    m2 = np.nansum((valores - media) ** 2, axis=0)
+
+    # Valores fora da grade caem no primeiro/último bin (np.clip)
+    histogramas = []
+    for j, borda in enumerate(bordas):
+        coluna = valores[:, j]
+        coluna = np.clip(coluna[~np.isnan(coluna)], borda[0], borda[-1])
+        histogramas.append(np.histogram(coluna, bins=borda)[0].astype(np.float64))
+
+    return {'colunas': list(colunas), 'contagem': contagem, 'media': media, 'm2': m2,
+            'bordas': bordas, 'histogramas': histogramas}
+
+
+def mesclar_estatisticas(a, b, sinal=1):
+    # Fórmula de Chan para juntar média/variância de duas partes.
+    # sinal=-1 REMOVE a parte b (cliente alterado: sai a versão antiga, entra a nova).
+    n_b = sinal * b['contagem']
+    n = a['contagem'] + n_b
+    delta = b['media'] - a['media']
+    seguro = np.maximum(n, 1)
+    media = a['media'] + delta * n_b / seguro
+    m2 = a['m2'] + sinal * b['m2'] + delta ** 2 * a['contagem'] * n_b / seguro
+    histogramas = [ha + sinal * hb for ha, hb in zip(a['histogramas'], b['histogramas'])]
+    return {**a, 'contagem': n, 'media': media, 'm2': np.maximum(m2, 0), 'histogramas': histogramas}
+
+
+def mediana_aproximada(estatisticas):
+    # Interpola dentro do bin onde a contagem acumulada cruza 50%
+    medianas = []
+    for borda, hist in zip(estatisticas['bordas'], estatisticas['histogramas']):
+        acumulado = np.cumsum(hist)
+        metade = acumulado[-1] / 2
+        i = int(np.searchsorted(acumulado, metade))
+        anterior = acumulado[i - 1] if i > 0 else 0.0
+        fracao = (metade - anterior) / hist[i] if hist[i] > 0 else 0.5
+        medianas.append(borda[i] + fracao * (borda[i + 1] - borda[i]))
+    return np.array(medianas)
+
+
+def sincronizar_preprocessor(pipeline, estatisticas, incluir_scaler=False):
+    # A mediana do imputer só afeta quem tem nulo: pode acompanhar a base todo dia.
+    # O scaler NÃO: as árvores antigas foram cortadas na escala antiga, e mudar
+    # média/desvio desloca todos os cortes. Ele só é atualizado no retreino completo.
+    num_pipe = pipeline.named_steps['preprocessor'].named_transformers_['num']
+    num_pipe.named_steps['imputer'].statistics_ = mediana_aproximada(estatisticas)
+    if incluir_scaler:
+        scaler = num_pipe.named_steps['scaler']
+        variancia = estatisticas['m2'] / np.maximum(estatisticas['contagem'], 1)
+        scaler.mean_ = estatisticas['media']
+        scaler.var_ = variancia
+        scaler.scale_ = np.where(variancia > 0, np.sqrt(variancia), 1.0)
+        scaler.n_samples_seen_ = estatisticas['contagem'].astype(np.int64)
+    return pipeline
+
+
+# ==============================================================================
+# 2. TREINO COMPLETO x CONTINUAÇÃO DO BOOSTING
+# ==============================================================================
+def treinar_completo(df):
+    pipeline = Pipeline(steps=[
+        ('preprocessor', construir_preprocessor_churn()),
+        ('classifier', XGBClassifier(**PARAMS_CLASSIFIER))
+    ])
+    pipeline.fit(df.drop(columns=['id_cliente', CHURN_TARGET]), df[CHURN_TARGET])
+    return pipeline
+
+
+def continuar_treino(pipeline, df_delta, n_rodadas=RODADAS_POR_DIA):
+    # Mesmo pré-processamento (já sincronizado), árvores novas em cima das antigas
+    X_delta = pipeline.named_steps['preprocessor'].transform(df_delta.drop(columns=['id_cliente', CHURN_TARGET]))
+    anterior = pipeline.named_steps['classifier']
+    novo = clone(anterior).set_params(n_estimators=n_rodadas)
+    novo.fit(X_delta, df_delta[CHURN_TARGET], xgb_model=anterior.get_booster())
+    pipeline.steps[-1] = ('classifier', novo)
+    return pipeline
+
+
+def retreino_diario(pipeline, estatisticas, df_novos_ou_alterados, df_versao_antiga=None,
+                    n_rodadas=RODADAS_POR_DIA):
+    # 1. Atualiza o estado: + delta do dia, - versão antiga dos clientes alterados
+    estatisticas = mesclar_estatisticas(
+        estatisticas, criar_estatisticas(df_novos_ou_alterados, bordas=estatisticas['bordas']))
+    if df_versao_antiga is not None and len(df_versao_antiga):
+        estatisticas = mesclar_estatisticas(
+            estatisticas, criar_estatisticas(df_versao_antiga, bordas=estatisticas['bordas']), sinal=-1)
+
+    # 2. Sincroniza medianas e continua o boosting
+    sincronizar_preprocessor(pipeline, estatisticas)
+    continuar_treino(pipeline, df_novos_ou_alterados, n_rodadas)
+    return pipeline, estatisticas
+
+
+# ==============================================================================
+# 3. BENCHMARK: INCREMENTAL x RETREINO COMPLETO
+# ==============================================================================
+def _simular_delta(base, rng, n_novos, n_alterados):
+    # Clientes novos (ids inéditos) + clientes antigos com comportamento atualizado
+    novos = gerar_chunk_churn(n_novos, rng, id_inicial=int(base['id_cliente'].max()) + 1)
+    ids_alterados = rng.choice(base['id_cliente'].to_numpy(), n_alterados, replace=False)
+    alterados = gerar_chunk_churn(n_alterados, rng)
+    alterados['id_cliente'] = ids_alterados
+    antigos = base[base['id_cliente'].isin(ids_alterados)]
+    return pd.concat([novos, alterados], ignore_index=True), antigos
+
+
+def benchmark(n_historico=200_000, n_dias=5, n_novos=10_000, n_alterados=5_000, semente=42):
+    rng = np.random.default_rng(semente)
+    base = gerar_chunk_churn(n_historico, rng)
+    teste = gerar_chunk_churn(50_000, np.random.default_rng(semente + 1))
+    X_teste, y_teste = teste.drop(columns=['id_cliente', CHURN_TARGET]), teste[CHURN_TARGET]
+
+    incremental = treinar_completo(base)
+    estatisticas = criar_estatisticas(base)
+
+    print(f"{'DIA':<5} | {'BASE':>10} | {'COMPLETO (s)':>12} | {'AUC COMPL.':>10} | "
+          f"{'INCREM. (s)':>11} | {'AUC INCREM.':>11}")
+    print("-" * 75)
+    resultados = []
+    for dia in range(1, n_dias + 1):
+        delta, antigos = _simular_delta(base, rng, n_novos, n_alterados)
+        base = pd.concat([base[~base['id_cliente'].isin(delta['id_cliente'])], delta], ignore_index=True)
+
+        inicio = time.perf_counter()
+        completo = treinar_completo(base)
+        tempo_completo = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        incremental, estatisticas = retreino_diario(incremental, estatisticas, delta, antigos)
+        tempo_incremental = time.perf_counter() - inicio
+
+        auc_completo = roc_auc_score(y_teste, completo.predict_proba(X_teste)[:, 1])
+        auc_incremental = roc_auc_score(y_teste, incremental.predict_proba(X_teste)[:, 1])
+        print(f"{dia:<5} | {len(base):>10,} | {tempo_completo:>12.2f} | {auc_completo:>10.4f} | "
+              f"{tempo_incremental:>11.2f} | {auc_incremental:>11.4f}")
+        resultados.append({'dia': dia, 'tamanho_base': len(base),
+                           'tempo_completo_s': tempo_completo, 'auc_completo': auc_completo,
+                           'tempo_incremental_s': tempo_incremental, 'auc_incremental': auc_incremental})
+
+    # Conferência do estado somável contra o recálculo do zero
+    mediana_real = base[CHURN_NUMERIC_FEATURES].median().to_numpy()
+    print("-" * 75)
+    print(f"🧪 Mediana incremental x recálculo: {np.round(mediana_aproximada(estatisticas), 1)} x {np.round(mediana_real, 1)}")
+    return pd.DataFrame(resultados)
+
+
+if __name__ == "__main__":
+    print("🔁 BENCHMARK: RETREINO COMPLETO x INCREMENTAL (WARM-START)")
+    benchmark()
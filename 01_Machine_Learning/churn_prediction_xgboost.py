@@ -1,46 +1,34 @@
 import pandas as pd
-import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.pipeline import Pipeline
-from sklearn.compose import ColumnTransformer
-from sklearn.impute import SimpleImputer
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
 from xgboost import XGBClassifier
 from sklearn.metrics import classification_report, roc_auc_score
+from retail_pipelines import construir_preprocessor_churn, CHURN_NUMERIC_FEATURES, CHURN_CATEGORICAL_FEATURES
+from dtype_optimizer import construir_pipeline_nativo
+from synthetic_data_factory import gerar_em_memoria
+from churn_batch_scoring import salvar_pipeline, pontuar_base_em_lotes
+from churn_fast_scoring import compilar_scorer, pontuar_cliente, validar_paridade, medir_latencia
+from churn_threshold_sweep import curva_receita_em_risco
+from churn_explanations import explicar_em_lotes, explicacoes_para_dataframe
+from pipeline_instrumentation import instrumentar, desinstrumentar, salvar_registro
+
+# Opt-in: True = mede tempo/memória de cada etapa do Pipeline e grava um JSON (pipeline_instrumentation.py)
+INSTRUMENTAR = False
+# Opt-in: True = tipos compactos (float32/int pequeno/'category') e XGBoost lendo as
+# categorias direto, sem one-hot (dtype_optimizer.py). Bem menos memória em base grande.
+TIPOS_COMPACTOS = False
 
 # ==============================================================================
 # 1. GERAÇÃO DE DADOS "BIG DATA" (SIMULADO)
 # ==============================================================================
 # Simulando 10.000 clientes com comportamentos complexos de varejo
-np.random.seed(42)
+# A fábrica (synthetic_data_factory.py) aplica as regras de negócio:
+# - Usou SAC recente -> sai (churn = 1);
+# - Gasta pouco (< R$ 500) -> metade sai;
+# - "Sujeira" real para testar o Pipeline: 5% de idade nula e 2% de categoria nula.
+# O mesmo gerador produz a base de 10 milhões do teste de carga.
 n_samples = 10000
-
-data = {
-    'id_cliente': range(1, n_samples + 1),
-    'idade': np.random.randint(18, 70, n_samples),
-    'tempo_como_cliente_meses': np.random.randint(1, 120, n_samples),
-    'total_gasto_ultimo_ano': np.random.exponential(1500, n_samples), # R$
-    'frequencia_compras_ano': np.random.randint(1, 50, n_samples),
-    'categoria_favorita': np.random.choice(['Moda', 'Casa', 'Pet', 'Tech'], n_samples),
-    'usou_sac_recente': np.random.choice([0, 1], n_samples, p=[0.8, 0.2]),
-}
-
-df = pd.DataFrame(data)
-
-churn_simulado = np.zeros(n_samples) # Todo mundo começa fiel (0)
-
-# Se usou SAC, vira 1 (sai)
-churn_simulado[df['usou_sac_recente'] == 1] = 1 
-
-# Se gasta pouco, vira 1 (sai)
-indices_baixo_gasto = df[df['total_gasto_ultimo_ano'] < 500].index
-churn_simulado[np.random.choice(indices_baixo_gasto, size=int(len(indices_baixo_gasto)*0.5))] = 1
-
-df['churn'] = churn_simulado.astype(int)
-
-# Introduzindo "Sujeira" Real (Valores Nulos) para testar o Pipeline
-df.loc[df.sample(500).index, 'idade'] = np.nan
-df.loc[df.sample(200).index, 'categoria_favorita'] = np.nan
+df = gerar_em_memoria('churn', n_samples)
 
 print(f"📊 Base carregada: {df.shape[0]} clientes. Taxa de Churn: {df['churn'].mean():.1%}")
 
@@ -58,30 +46,9 @@ X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, stratif
 # Nada de tratar dados manualmente! O Pipeline garante que o que fizermos no treino
 # será aplicado IGUAL na produção.
 
-# Tratamento para Variáveis Numéricas (Idade, Gastos)
-# 1. Preenche nulos com a Mediana (SimpleImputer)
-# 2. Coloca na mesma escala (StandardScaler)
-numeric_features = ['idade', 'tempo_como_cliente_meses', 'total_gasto_ultimo_ano', 'frequencia_compras_ano']
-numeric_transformer = Pipeline(steps=[
-    ('imputer', SimpleImputer(strategy='median')),
-    ('scaler', StandardScaler())
-])
-
-# Tratamento para Variáveis Categóricas (Categoria, SAC)
-# 1. Preenche nulos com "Constant"
-# 2. Transforma texto em números (OneHotEncoder)
-categorical_features = ['categoria_favorita', 'usou_sac_recente']
-categorical_transformer = Pipeline(steps=[
-    ('imputer', SimpleImputer(strategy='constant', fill_value='missing')),
-    ('onehot', OneHotEncoder(handle_unknown='ignore'))
-])
-
-# Juntando tudo no Pré-Processador
-preprocessor = ColumnTransformer(
-    transformers=[
-        ('num', numeric_transformer, numeric_features),
-        ('cat', categorical_transformer, categorical_features)
-    ])
+# A receita (numéricas: mediana + escala | categóricas: 'missing' + OneHot) mora no
+# retail_pipelines.py: o treino em lotes, o retreino diário e os benchmarks usam a MESMA.
+preprocessor = construir_preprocessor_churn()
 
 # ==============================================================================
 # 3. O MODELO (XGBOOST - O REI DO VAREJO)
@@ -93,6 +60,15 @@ model_pipeline = Pipeline(steps=[
     ('classifier', XGBClassifier(n_estimators=100, learning_rate=0.1, scale_pos_weight=5, random_state=42))
 ])
 
+if TIPOS_COMPACTOS:
+    # Mesmos hiperparâmetros; o ColumnTransformer dá lugar à conversão de tipos
+    model_pipeline = construir_pipeline_nativo(CHURN_NUMERIC_FEATURES + CHURN_CATEGORICAL_FEATURES, 'classificacao',
+                                               n_estimators=100, learning_rate=0.1, scale_pos_weight=5,
+                                               random_state=42)
+
+if INSTRUMENTAR:
+    model_pipeline = instrumentar(model_pipeline)
+
 print("\n⚙️ Treinando o Motor de IA (Pipeline Completo)...")
 model_pipeline.fit(X_train, y_train)
 print("✅ Treinamento Concluído!")
@@ -108,6 +84,12 @@ print("="*40)
 y_pred = model_pipeline.predict(X_test)
 y_proba = model_pipeline.predict_proba(X_test)[:, 1]
 
+if INSTRUMENTAR:
+    # Daqui para frente o código inspeciona as etapas (SHAP, scorer compilado): volta ao Pipeline original
+    caminho_json = salvar_registro('instrumentacao_churn.json', {'script': 'churn', 'linhas_treino': len(X_train)})
+    print(f"🩺 Tempo por etapa salvo em {caminho_json}")
+    model_pipeline = desinstrumentar(model_pipeline)
+
 # Métricas Técnicas
 print(f"ROC-AUC Score (Capacidade de Separação): {roc_auc_score(y_test, y_proba):.4f}")
 print("\nRelatório de Classificação:\n", classification_report(y_test, y_pred))
@@ -130,4 +112,63 @@ dinheiro_em_risco = alto_risco['total_gasto_ultimo_ano'].sum()
 
 print(f"🚨 Clientes em Zona de Risco (>70%): {len(alto_risco)}")
 print(f"💸 Receita Anual em Perigo (LTV em Risco): R$ {dinheiro_em_risco:,.2f}")
-print("📢 Ação Sugerida: Enviar cupom de 10% ou ligar para estes clientes HOJE.")
\ No newline at end of file
+print("📢 Ação Sugerida: Enviar cupom de 10% ou ligar para estes clientes HOJE.")
+
+# E se o corte fosse outro? A curva inteira sai de UMA ordenação + somas acumuladas
+limiares_marketing = [0.5, 0.6, 0.7, 0.8, 0.9]
+curva = curva_receita_em_risco(results['Risco_Churn_Prob'], results['total_gasto_ultimo_ano'],
+                               real=results['Real_Churn'], limiares=limiares_marketing)
+print("\n📊 CURVA DE CORTE (Receita em Risco x Precisão x Recall):")
+print(curva.round({'receita_em_risco': 2, 'precisao': 3, 'recall': 3}).to_string(index=False))
+
+curva_categoria = curva_receita_em_risco(results['Risco_Churn_Prob'], results['total_gasto_ultimo_ano'],
+                                         real=results['Real_Churn'], grupos=results['categoria_favorita'],
+                                         limiares=[0.7])
+print("\n🏷️ Corte 70% por Categoria Favorita:")
+print(curva_categoria.round({'receita_em_risco': 2, 'precisao': 3, 'recall': 3}).to_string(index=False))
+
+# Por que cada um está em risco? Top-3 motivos (SHAP das próprias árvores) para o agente de retenção
+explicacoes = explicar_em_lotes(model_pipeline, alto_risco[X_test.columns])
+print("\n🔎 Top-3 Motivos de Risco (primeiros 5 clientes da Zona de Risco):")
+print(explicacoes_para_dataframe(explicacoes).head().to_string())
+
+# ==============================================================================
+# 6. PRODUÇÃO: MODELO SALVO + SCORING EM LOTE (BASE INTEIRA)
+# ==============================================================================
+# Na rodada noturna a base tem dezenas de milhões de clientes: nada de predict_proba
+# num DataFrame gigante. Salvamos o Pipeline e pontuamos em chunks, em paralelo.
+print("\n" + "="*40)
+print("🏭 PRODUÇÃO (SCORING EM LOTE)")
+print("="*40)
+
+caminho_modelo = salvar_pipeline(model_pipeline)
+print(f"💾 Modelo salvo em '{caminho_modelo}'")
+
+# Simulação: exportamos a base de teste como se fosse o arquivo da noite
+df.loc[X_test.index].to_csv('base_clientes_demo.csv', index=False)
+pontuar_base_em_lotes('base_clientes_demo.csv', 'base_clientes_demo_scores.csv',
+                      caminho_modelo=caminho_modelo, tamanho_chunk=500)
+
+# ==============================================================================
+# 7. TEMPO REAL: CLIENTE LIGOU NO SAC (SCORING EM MENOS DE 1 MS)
+# ==============================================================================
+print("\n" + "="*40)
+print("⚡ SCORING EM TEMPO REAL (SAC)")
+print("="*40)
+
+if TIPOS_COMPACTOS:
+    # O scorer compilado reproduz imputer + scaler + one-hot: não se aplica ao caminho nativo
+    print("⏭️ Scorer compilado só existe para o Pipeline com one-hot (TIPOS_COMPACTOS = False)")
+else:
+    scorer = compilar_scorer(model_pipeline)
+
+    # Paridade: o atalho TEM que dar a mesma probabilidade que o Pipeline oficial
+    diferenca = validar_paridade(scorer, model_pipeline, X_test)
+    print(f"🧪 Paridade com o Pipeline: OK (diferença máxima {diferenca:.1e})")
+
+    clientes_sac = X_test.head(500).to_dict('records')
+    latencia_pipeline = medir_latencia(lambda c: model_pipeline.predict_proba(pd.DataFrame([c]))[:, 1],
+                                       clientes_sac[:100])
+    latencia_compilada = medir_latencia(lambda c: pontuar_cliente(scorer, c), clientes_sac)
+    print(f"🐢 Pipeline sklearn:  p50 {latencia_pipeline['p50_ms']:.3f} ms | p99 {latencia_pipeline['p99_ms']:.3f} ms")
+    print(f"🚀 Scorer compilado:  p50 {latencia_compilada['p50_ms']:.3f} ms | p99 {latencia_compilada['p99_ms']:.3f} ms")
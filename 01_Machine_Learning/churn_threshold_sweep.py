@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+# ==============================================================================
+# 📉 CURVA DE RECEITA EM RISCO (TODOS OS CORTES DE UMA VEZ)
+# ==============================================================================
+# Em vez de refiltrar o DataFrame para cada corte (> 0.5, > 0.6, > 0.7...),
+# ordenamos os clientes UMA vez pela probabilidade e usamos somas acumuladas:
+# "quem está acima do corte t" vira simplesmente "os k primeiros da fila".
+# Regra do corte: cliente sinalizado se probabilidade > limiar (estrito, a mesma
+# regra de negócio do script: Risco_Churn_Prob > 0.7).
+
+
+def _curva_ordenada(prob_desc, receita, real, limiares):
+    # prob_desc já está em ordem decrescente; receita/real acompanham a mesma ordem
+    receita_acum = np.concatenate([[0.0], np.cumsum(receita, dtype=np.float64)])
+    k = np.searchsorted(-prob_desc, -limiares, side='left')  # Quantos têm prob > limiar (empate fica fora)
+
+    curva = {
+        'limiar': limiares,
+        'clientes_sinalizados': k,
+        'receita_em_risco': receita_acum[k],
+    }
+    if real is not None:
+        acertos_acum = np.concatenate([[0], np.cumsum(real, dtype=np.int64)])
+        acertos = acertos_acum[k]
+        total_churn = acertos_acum[-1]
+        curva['churns_capturados'] = acertos
+        curva['precisao'] = np.divide(acertos, k, out=np.full(len(k), np.nan), where=k > 0)
+        curva['recall'] = acertos / total_churn if total_churn > 0 else np.full(len(k), np.nan)
+    return curva
+
+
+def curva_receita_em_risco(prob, receita, real=None, grupos=None, limiares=None):
+    # prob: probabilidade de churn | receita: total_gasto_ultimo_ano | real: churn (opcional)
+    # grupos: ex. categoria_favorita (opcional) | limiares: grade de cortes ou None = todos
+    prob = np.asarray(prob, dtype=np.float64)
+    receita = np.asarray(receita, dtype=np.float64)
+    real = None if real is None else np.asarray(real, dtype=np.int64)
+
+    if grupos is None:
+        ordem = np.argsort(-prob, kind='stable')
+        limites = [(None, 0, len(prob))]
+    else:
+        codigos, nomes = pd.factorize(pd.Series(grupos).fillna('Sem categoria'), sort=True)
+        # Uma ordenação só: por grupo e, dentro do grupo, probabilidade decrescente
+        ordem = np.lexsort((-prob, codigos))
+        inicios = np.searchsorted(codigos[ordem], np.arange(len(nomes) + 1))
+        limites = [(nomes[g], inicios[g], inicios[g + 1]) for g in range(len(nomes))]
+
+    prob_ord, receita_ord = prob[ordem], receita[ordem]
+    real_ord = None if real is None else real[ordem]
+
+    partes = []
+    for nome, ini, fim in limites:
+        prob_desc = prob_ord[ini:fim]
+        cortes = np.unique(prob_desc)[::-1] if limiares is None else np.asarray(limiares, dtype=np.float64)
+        curva = _curva_ordenada(prob_desc, receita_ord[ini:fim],
+                                None if real_ord is None else real_ord[ini:fim], cortes)
+        parte = pd.DataFrame(curva)
+        if grupos is not None:
+            parte.insert(0, 'grupo', nome)
+        partes.append(parte)
+    return pd.concat(partes, ignore_index=True)
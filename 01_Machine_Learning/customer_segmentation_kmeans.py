@@ -1,39 +1,35 @@
-import pandas as pd
-import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from sklearn.preprocessing import StandardScaler
 from sklearn.cluster import KMeans
 import warnings
+from rfm_engine import agregar_transacoes, calcular_rfm
+from synthetic_data_factory import gerar_em_memoria
+from kmeans_selection import buscar_k_paralelo
+from varejo_comum import compilar_regras
+from segment_assignment import salvar_modelo_segmentos, carregar_modelo_segmentos, atribuir_segmentos, atribuir_cliente
+from pipeline_instrumentation import instrumentar, salvar_registro
 
 warnings.filterwarnings('ignore')
 
+# Opt-in: True = mede tempo/memória de cada etapa do Pipeline e grava um JSON (pipeline_instrumentation.py)
+INSTRUMENTAR = False
+
 # ==============================================================================
 # 1. GERAÇÃO DE DADOS TRANSACIONAIS (O CAOS REAL)
 # ==============================================================================
 # Diferente dos outros, aqui geramos COMPRAS soltas, não o resumo do cliente.
 # O desafio é transformar "Linhas de Nota Fiscal" em "Perfil de Cliente".
-np.random.seed(42)
 n_transacoes = 10000
 n_clientes = 1000
 
 print("🎲 Gerando 10.000 transações de compras aleatórias...")
 
-# IDs de clientes (alguns compram muito, outros pouco)
-cliente_ids = np.random.randint(1, n_clientes + 1, n_transacoes)
-
-# Datas (últimos 365 dias)
-datas = pd.date_range(end=pd.Timestamp.now(), periods=365).tolist()
-data_compra = np.random.choice(datas, n_transacoes)
-
-# Valores (Regra de Pareto: poucos gastam muito)
-valores = np.random.exponential(scale=200, size=n_transacoes) + 20 # Mínimo R$ 20
-
-df_transacoes = pd.DataFrame({
-    'id_cliente': cliente_ids,
-    'data_compra': data_compra,
-    'valor': valores
-})
+# A fábrica (synthetic_data_factory.py) sorteia:
+# - IDs de clientes (alguns compram muito, outros pouco);
+# - Datas nos últimos 365 dias;
+# - Valores com Regra de Pareto: poucos gastam muito (mínimo R$ 20).
+df_transacoes = gerar_em_memoria('transacoes', n_transacoes, n_clientes=n_clientes)
 
 print(f"📊 Base Bruta: {len(df_transacoes)} vendas realizadas.")
 
@@ -44,18 +40,12 @@ print(f"📊 Base Bruta: {len(df_transacoes)} vendas realizadas.")
 # R (Recência): Quantos dias faz que ele não compra? (Menor é melhor)
 # F (Frequência): Quantas vezes comprou? (Maior é melhor)
 # M (Monetário): Quanto gastou no total? (Maior é melhor)
-
-ultima_data = df_transacoes['data_compra'].max()
-
-df_rfm = df_transacoes.groupby('id_cliente').agg({
-    'data_compra': lambda x: (ultima_data - x.max()).days, # Recência
-    'id_cliente': 'count',                                 # Frequência
-    'valor': 'sum'                                         # Monetário
-}).rename(columns={
-    'data_compra': 'Recencia',
-    'id_cliente': 'Frequencia',
-    'valor': 'Monetario'
-})
+#
+# O motor RFM (rfm_engine.py) agrega tudo com reduções vetorizadas (datas em int64):
+# nada de lambda por cliente. Em produção o mesmo motor roda em streaming,
+# atualizando um estado salvo por cliente só com as vendas novas do dia.
+estado_clientes = agregar_transacoes(df_transacoes)    # Última compra, nº de compras, total gasto
+df_rfm = calcular_rfm(estado_clientes)                 # Referência = última data da base
 
 print("\n📋 Perfil RFM dos Clientes (Primeiras 5 linhas):")
 print(df_rfm.head())
@@ -67,6 +57,8 @@ print(df_rfm.head())
 # Recência vai de 0 a 365 dias. Monetário vai de 0 a R$ 10.000.
 # Sem escalar, o K-Means vai achar que o dinheiro é 100x mais importante que os dias.
 scaler = StandardScaler()
+if INSTRUMENTAR:
+    scaler = instrumentar(scaler, 'scaler')
 rfm_scaled = scaler.fit_transform(df_rfm)
 
 # ==============================================================================
@@ -75,33 +67,34 @@ rfm_scaled = scaler.fit_transform(df_rfm)
 # Como é não-supervisionado, não sabemos se existem 3, 4 ou 10 tipos de clientes.
 # A IA vai testar e nos dizer onde o erro "quebra" (o cotovelo).
 
-erro_wcss = []
 range_k = range(1, 11) # Testa de 1 a 10 grupos
 
 print("\n💪 Calculando o 'Cotovelo' para achar o número ideal de grupos...")
-for k in range_k:
-    kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
-    kmeans.fit(rfm_scaled)
-    erro_wcss.append(kmeans.inertia_) # Inertia = quão bagunçados estão os grupos
-    # ... (o loop for k in range_k que você já tem)
+# Todos os K rodam em paralelo (um processo por K). Em bases de milhões de clientes,
+# use tamanho_amostra=200_000 e/ou usar_minibatch=True: só o K final vê a base inteira.
+resultado_cotovelo = buscar_k_paralelo(rfm_scaled, range_k)
+erro_wcss = resultado_cotovelo['inercia'].tolist() # Inertia = quão bagunçados estão os grupos
+silhuetas = resultado_cotovelo['silhueta'].tolist()  # Silhueta = quão separados estão os grupos (-1 a 1)
 
 print("\n📉 A TABELA DA DECISÃO (ELBOW METHOD):")
-print(f"{'GRUPOS (K)':<10} | {'BAGUNÇA (INERTIA)':<20} | {'QUANTO MELHOROU?'}")
-print("-" * 50)
+print(f"{'GRUPOS (K)':<10} | {'BAGUNÇA (INERTIA)':<20} | {'QUANTO MELHOROU?':<16} | {'SILHUETA'}")
+print("-" * 65)
 
 ultimo_erro = 0
 for i, erro in enumerate(erro_wcss):
     k = i + 1
     diferenca = ultimo_erro - erro if k > 1 else 0
-    print(f"{k:<10} | {erro:<20.0f} | -{diferenca:.0f}")
+    print(f"{k:<10} | {erro:<20.0f} | -{diferenca:<15.0f} | {silhuetas[i]:.3f}")
     ultimo_erro = erro
 
-print("-" * 50)
+print("-" * 65)
 print("💡 DICA: Pare quando a 'Melhora' começar a ficar pequena.")
 
 # Matematicamente, vamos escolher 4 grupos para este exemplo (é um padrão bom pro varejo)
 k_ideal = 4
 model = KMeans(n_clusters=k_ideal, random_state=42, n_init=10)
+if INSTRUMENTAR:
+    model = instrumentar(model, 'kmeans')
 clusters = model.fit_predict(rfm_scaled)
 
 # Adiciona o resultado na tabela original
@@ -126,26 +119,21 @@ analise_grupos = df_rfm.groupby('Cluster').agg({
 # Assim garantimos que não existem "tuplas" ou "multi-index" para confundir o código
 analise_grupos.columns = ['Media_Dias_Sem_Comprar', 'Media_Compras_Ano', 'Media_Gasto_Total', 'Qtd_Clientes']
 
-# 3. Agora a função usa os nomes simples que definimos acima
-def nomear_cluster(row):
-    r = row['Media_Dias_Sem_Comprar']
-    f = row['Media_Compras_Ano']
-    m = row['Media_Gasto_Total']
-    
+# 3. Agora as regras usam os nomes simples que definimos acima.
+# A ORDEM importa: a primeira regra que bate vence (igual a um if/elif).
+# Compiladas num np.select (varejo_comum/segment_rules.py, o mesmo motor do CRM Pet), rodam na coluna inteira de uma vez.
+REGRAS_PERFIL = [
     # Ajustando a régua para a realidade dos dados gerados
-    if m > 2500: # Baixei de 3000 para 2500
-        return "💎 CAMPEÕES (VIPs)"
-    elif r > 90 and m > 1000: # Baixei recência para 90 dias (3 meses já é risco)
-        return "⚠️ EM RISCO (Gastavam bem e sumiram)"
-    elif r > 90: # Baixei para 90 dias
-        return "💤 HIBERNANDO"
-    elif f > 5:
-        return "🌱 PROMESSAS (Novos e ativos)"
-    else:
-        return "👤 CLIENTE PADRÃO"
+    ("💎 CAMPEÕES (VIPs)", [('Media_Gasto_Total', '>', 2500)]),   # Baixei de 3000 para 2500
+    ("⚠️ EM RISCO (Gastavam bem e sumiram)",                       # Baixei recência para 90 dias (3 meses já é risco)
+     [('Media_Dias_Sem_Comprar', '>', 90), ('Media_Gasto_Total', '>', 1000)]),
+    ("💤 HIBERNANDO", [('Media_Dias_Sem_Comprar', '>', 90)]),      # Baixei para 90 dias
+    ("🌱 PROMESSAS (Novos e ativos)", [('Media_Compras_Ano', '>', 5)]),
+]
+nomear_cluster = compilar_regras(REGRAS_PERFIL, padrao="👤 CLIENTE PADRÃO")
 
-# Aplica a função
-analise_grupos['Perfil'] = analise_grupos.apply(nomear_cluster, axis=1)
+# Aplica as regras
+analise_grupos['Perfil'] = nomear_cluster(analise_grupos)
 
 # Ordena por quem gasta mais
 print(analise_grupos.sort_values('Media_Gasto_Total', ascending=False))
@@ -204,4 +192,28 @@ print(f"   R$ {receita_com_ia:,.2f}")
 
 print("-" * 60)
 print(f"🚀 DINHEIRO NOVO NA MESA (UPLIFT): R$ {uplift:,.2f}")
-print("=" * 60)
\ No newline at end of file
+print("=" * 60)
+
+# ==============================================================================
+# 7. SEGMENTO EM TEMPO REAL (CLIENTE NOVO NO CAIXA)
+# ==============================================================================
+# O CRM não precisa rodar o K-Means de novo: salvamos scaler + centróides + perfis
+# num arquivo pequeno e classificamos qualquer cliente (ou lote) na hora.
+print("\n" + "="*60)
+print("🎯 SEGMENTAÇÃO EM TEMPO REAL (MODELO SALVO)")
+print("="*60)
+
+caminho_segmentos = salvar_modelo_segmentos(scaler, model, analise_grupos['Perfil'].to_dict())
+modelo_segmentos = carregar_modelo_segmentos(caminho_segmentos)
+
+# Conferência: o atalho tem que concordar com o KMeans original
+clusters_lote, perfis_lote = atribuir_segmentos(modelo_segmentos, df_rfm)
+concordancia = (clusters_lote == df_rfm['Cluster'].to_numpy()).mean()
+print(f"🧪 Concordância com o K-Means: {concordancia:.2%}")
+
+cluster_novo, perfil_novo = atribuir_cliente(modelo_segmentos, recencia=5, frequencia=18, monetario=4200.0)
+print(f"🛒 Cliente novo (comprou há 5 dias, 18 compras, R$ 4.200): Grupo {cluster_novo} -> {perfil_novo}")
+
+if INSTRUMENTAR:
+    caminho_json = salvar_registro('instrumentacao_segmentacao.json', {'script': 'segmentacao', 'clientes': len(df_rfm)})
+    print(f"🩺 Tempo por etapa salvo em {caminho_json}")
@@ -1,10 +1,9 @@
-import pandas as pd
 import numpy as np
 import warnings
-from sklearn.model_selection import train_test_split, GridSearchCV
+from sklearn.model_selection import train_test_split, KFold
+from sklearn.base import clone
 from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import StandardScaler, PolynomialFeatures, OneHotEncoder
-from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import PolynomialFeatures
 from sklearn.impute import SimpleImputer
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 
@@ -13,46 +12,40 @@ from sklearn.linear_model import LinearRegression, Ridge
 from sklearn.tree import DecisionTreeRegressor
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.svm import SVR
+from sklearn.kernel_approximation import Nystroem
 from sklearn.neural_network import MLPRegressor
 from xgboost import XGBRegressor
 
+from retail_pipelines import construir_preprocessor_demanda, DEMANDA_NUMERIC_FEATURES, DEMANDA_CATEGORICAL_FEATURES
+from dtype_optimizer import construir_pipeline_nativo
+from synthetic_data_factory import gerar_em_memoria
+from stock_cost import calcular_prejuizo_vetorizado, quantil_otimo
+from pipeline_instrumentation import instrumentar, salvar_registro
+from model_search import (construir_cache_folds, avaliar_modelos_em_pool, melhores_por_modelo, montar_campeao,
+                          torneio_sucessivo)
+
 warnings.filterwarnings('ignore')
 
+# Opt-in: True = mede tempo/memória de cada etapa do Pipeline e grava um JSON (pipeline_instrumentation.py)
+INSTRUMENTAR = False
+# Opt-in: True = entra no torneio um XGBoost com tipos compactos e 'category' nativa
+# (sem one-hot, dtype_optimizer.py), disputando com os demais no mesmo teste
+TIPOS_COMPACTOS = False
+
 # ==============================================================================
 # 1. GERAÇÃO DE DADOS COMPLEXOS (Varejo Realista)
 # ==============================================================================
-np.random.seed(42)
 n_samples = 2000
 
 print("🎲 Gerando dados de vendas de lojas físicas e e-commerce...")
 
-data = {
-    'investimento_marketing': np.random.uniform(500, 5000, n_samples), # R$ investido
-    'preco_produto': np.random.uniform(50, 200, n_samples),            # Preço unitário
-    'dia_semana': np.random.choice(['Seg', 'Ter', 'Qua', 'Qui', 'Sex', 'Sab', 'Dom'], n_samples),
-    'feriado': np.random.choice([0, 1], n_samples, p=[0.95, 0.05]),    # É feriado?
-    'temperatura_media': np.random.uniform(15, 35, n_samples),         # Clima afeta moda
-    'concorrente_em_promocao': np.random.choice([0, 1], n_samples),
-}
-
-df = pd.DataFrame(data)
-
-# --- CRIANDO O TARGET (Unidades Vendidas) COM LÓGICA DE NEGÓCIO ---
-# Fórmula secreta do mercado:
+# Fórmula secreta do mercado (aplicada pela fábrica, synthetic_data_factory.py):
 # - Preço alto derruba venda.
 # - Marketing sobe venda (mas tem teto).
 # - Fim de semana vende mais.
 # - Frio vende mais casaco (vamos supor que é coleção de inverno).
-
-base_vendas = 100 
-efeito_preco = (200 - df['preco_produto']) * 0.8  # Quanto mais barato, mais vende
-efeito_mkt = np.log(df['investimento_marketing']) * 10
-efeito_fds = df['dia_semana'].isin(['Sab', 'Dom']).astype(int) * 30
-efeito_temp = (35 - df['temperatura_media']) * 2 # Quanto mais frio, mais vende
-
-# Somando tudo e adicionando um erro aleatório (o caos do mundo real)
-demanda_real = base_vendas + efeito_preco + efeito_mkt + efeito_fds + efeito_temp + np.random.normal(0, 15, n_samples)
-df['unidades_vendidas'] = np.maximum(0, demanda_real).astype(int) # Não existe venda negativa
+# - Mais um erro aleatório (o caos do mundo real); venda negativa vira 0.
+df = gerar_em_memoria('demanda', n_samples)
 
 print(f"📊 Base pronta: {len(df)} registros. Venda Média: {df['unidades_vendidas'].mean():.0f} unidades/dia.")
 
@@ -63,23 +56,9 @@ X = df.drop('unidades_vendidas', axis=1)
 y = df['unidades_vendidas']
 X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
-# Tratamento Numérico (Essencial para Redes Neurais e SVR)
-numeric_features = ['investimento_marketing', 'preco_produto', 'temperatura_media']
-numeric_transformer = Pipeline(steps=[
-    ('scaler', StandardScaler())
-])
-
-# Tratamento Categórico
-categorical_features = ['dia_semana']
-categorical_transformer = Pipeline(steps=[
-    ('onehot', OneHotEncoder(handle_unknown='ignore'))
-])
-
-preprocessor = ColumnTransformer(
-    transformers=[
-        ('num', numeric_transformer, numeric_features),
-        ('cat', categorical_transformer, categorical_features)
-    ])
+# Numéricas na mesma escala (essencial para Redes Neurais e SVR) + OneHot no dia da semana.
+# A receita mora no retail_pipelines.py (a mesma do treino em lotes e dos benchmarks).
+preprocessor = construir_preprocessor_demanda()
 
 # ==============================================================================
 # 3. A BATALHA DOS 7 EXÉRCITOS (GRID SEARCH)
@@ -121,6 +100,14 @@ modelos = [
         'nome': '7. MLP Neural Network (Rede Neural)',
         'estimator': MLPRegressor(random_state=42, max_iter=500),
         'params': {'hidden_layer_sizes': [(50,), (100,)], 'activation': ['relu']}
+    },
+    {
+        # Mesmo kernel RBF do SVR, mas aproximado: Nystroem sorteia alguns "pontos de apoio"
+        # e vira um mapa de features fixo; depois é só uma regressão linear (Ridge).
+        # Custo linear no nº de linhas -> dá para levar um método de kernel a 1M+ linhas.
+        'nome': '8. SVR-Aprox (Nystroem + Ridge)',
+        'estimator': Pipeline([('nystroem', Nystroem(kernel='rbf', random_state=42)), ('ridge', Ridge())]),
+        'params': {'nystroem__n_components': [300], 'ridge__alpha': [0.1, 1.0]}
     }
 ]
 
@@ -129,40 +116,79 @@ melhor_score_r2 = -float('inf')
 melhor_nome = ""
 resultados_lista = []
 
+# --- CACHE DE FOLDS ---
+# O pré-processador não tem hiperparâmetro no grid: transformamos os 3 folds UMA vez
+# e todos os modelos/parâmetros treinam em cima das mesmas matrizes prontas.
+# Mesmos folds do GridSearchCV(cv=3) padrão para regressão: KFold(3) sem embaralhar.
+if INSTRUMENTAR:
+    # Os fits dos candidatos rodam nos workers (não entram no registro); o pré-processamento
+    # dos folds, o refit de cada campeão e as previsões, sim.
+    preprocessor = instrumentar(preprocessor, 'preprocessor')
+cache_folds = construir_cache_folds(preprocessor, X_train, y_train, cv=KFold(n_splits=3))
+
+
+def refit_campeao(estimator, params):
+    # Refit na base de treino inteira; com INSTRUMENTAR o fit do regressor entra no registro
+    if INSTRUMENTAR:
+        estimator = instrumentar(clone(estimator), 'pipeline/regressor')
+    return montar_campeao(estimator, params, cache_folds)
+
+print(f"\n🗂️ Folds pré-processados uma única vez em {cache_folds['tempo_preprocessamento_s']:.2f}s")
+
+# --- MODO DO TORNEIO ---
+# 'grid'    = exaustivo: todo candidato treina na base inteira (bom para bases pequenas)
+# 'halving' = eliminação: todos começam numa amostra pequena, só os melhores avançam
+#             para amostras maiores, e cada modelo tem um orçamento de segundos.
+MODO_TORNEIO = 'grid'
+ORCAMENTO_POR_MODELO_S = 60
+SCORING = 'neg_root_mean_squared_error'
+
+if MODO_TORNEIO == 'halving':
+    placar, finalistas = torneio_sucessivo(modelos, preprocessor, X_train, y_train, KFold(n_splits=3), SCORING,
+                                           orcamento_por_modelo_s=ORCAMENTO_POR_MODELO_S)
+    print("\n⏱️ PLACAR DA ELIMINAÇÃO (score = -RMSE na validação, tempo de treino por candidato):")
+    print(placar.round({'score': 2, 'tempo_fit_s': 3}).to_string(index=False))
+    # Só os finalistas são retreinados na base inteira
+    competidores = ((c['modelo'], refit_campeao(c['estimator'], c['params'])) for c in finalistas)
+else:
+    # Cada modelo treina direto nas matrizes do cache (inclusive a Polinomial, que já é
+    # um Pipeline poly -> linear e recebe 'poly__degree' sem adaptação).
+    # Todas as tarefas (modelo x parâmetros x fold) de todos os modelos vão para UM pool só,
+    # com 1 thread de OpenMP/BLAS por worker: nada de pool ocioso entre um modelo e outro
+    # nem XGBoost abrindo uma thread por núcleo dentro de cada processo.
+    # O campeão de cada modelo volta como Pipeline(preprocessor + regressor).
+    campeoes = melhores_por_modelo(avaliar_modelos_em_pool(modelos, cache_folds, SCORING)).set_index('modelo')
+    competidores = ((item['nome'], refit_campeao(item['estimator'], campeoes.loc[item['nome'], 'params']))
+                    for item in modelos)
+
+if TIPOS_COMPACTOS:
+    def _com_xgb_nativo(competidores):
+        yield from competidores
+        # Topo do grid do XGBoost, treinado nos dados com tipos compactos (sem o preprocessor one-hot)
+        nativo = construir_pipeline_nativo(DEMANDA_NUMERIC_FEATURES + DEMANDA_CATEGORICAL_FEATURES, 'regressao',
+                                           nome_etapa='regressor', n_estimators=100, learning_rate=0.1,
+                                           random_state=42)
+        yield 'XGBoost Nativo (category)', nativo.fit(X_train, y_train)
+
+    competidores = _com_xgb_nativo(competidores)
+
 print("\n🥊 INICIANDO TORNEIO DE REGRESSÃO...")
 print("-" * 80)
 print(f"{'MODELO':<35} | {'RMSE (Erro Médio)':<20} | {'R² (Precisão)':<10}")
 print("-" * 80)
 
-for item in modelos:
-    # Pipeline individual para cada modelo (necessário pois alguns precisam de pre-processamento diferente)
-    # Mas aqui usaremos o preprocessor padrão para todos para simplificar a comparação
-    
-    # Se for Polinomial, o estimator já é um pipeline, então tratamos diferente
-    if 'Polinomial' in item['nome']:
-        model_pipeline = Pipeline(steps=[('preprocessor', preprocessor), 
-                                         ('poly', item['estimator'].steps[0][1]),
-                                         ('linear', item['estimator'].steps[1][1])])
-        # Ajuste params para o pipeline
-        grid_params = {f'poly__{k.split("__")[1]}': v for k, v in item['params'].items()}
-    else:
-        model_pipeline = Pipeline(steps=[('preprocessor', preprocessor), ('regressor', item['estimator'])])
-        grid_params = {f'regressor__{k}': v for k, v in item['params'].items()}
-
-    grid = GridSearchCV(model_pipeline, grid_params, cv=3, scoring='neg_root_mean_squared_error', n_jobs=-1)
-    grid.fit(X_train, y_train)
-    
+for nome_modelo, best_estimator in competidores:
     # Avaliando
-    y_pred_grid = grid.best_estimator_.predict(X_test)
+    y_pred_grid = best_estimator.predict(X_test)
     rmse = np.sqrt(mean_squared_error(y_test, y_pred_grid))
     r2 = r2_score(y_test, y_pred_grid)
     
-    print(f"{item['nome']:<35} | {rmse:.2f} unidades{' '*6} | {r2:.2%}")
+    print(f"{nome_modelo:<35} | {rmse:.2f} unidades{' '*6} | {r2:.2%}")
     
     if r2 > melhor_score_r2:
         melhor_score_r2 = r2
-        melhor_modelo = grid.best_estimator_
-        melhor_nome = item['nome']
+        melhor_modelo = best_estimator
+        melhor_nome = nome_modelo
 
 print("-" * 80)
 print(f"🏆 GRANDE CAMPEÃO: {melhor_nome.upper()} com {melhor_score_r2:.2%} de precisão!")
@@ -176,6 +202,8 @@ print("=" * 60)
 
 # PREMISSAS
 # Vamos comparar o Modelo vs. "Média Móvel" (O jeito antigo que as empresas fazem)
+if INSTRUMENTAR:
+    melhor_modelo = instrumentar(melhor_modelo)
 y_pred_final = melhor_modelo.predict(X_test)
 
 # Baseline: O gerente chuta que vai vender a média do passado
@@ -186,13 +214,9 @@ custo_oportunidade = 50.00  # Lucro que deixo de ganhar se faltar produto (Stock
 custo_estoque = 20.00       # Custo de armazenar produto encalhado (Overstock)
 
 def calcular_prejuizo(reais, previstos):
-    prejuizo_total = 0
-    for real, pred in zip(reais, previstos):
-        erro = pred - real
-        if erro < 0: # Previ menos do que vendeu (Faltou produto)
-            prejuizo_total += abs(erro) * custo_oportunidade
-        elif erro > 0: # Previ mais do que vendeu (Sobrou produto)
-            prejuizo_total += abs(erro) * custo_estoque
+    # Faltou produto: erro * custo_oportunidade | Sobrou produto: erro * custo_estoque
+    # Versão vetorizada (stock_cost.py): roda milhões de SKU-loja-dia sem loop Python
+    prejuizo_total, _ = calcular_prejuizo_vetorizado(reais, previstos, custo_oportunidade, custo_estoque)
     return prejuizo_total
 
 perda_gerente = calcular_prejuizo(y_test, previsao_gerente)
@@ -207,4 +231,19 @@ print(f"   - Prejuízo por erro de estoque: R$ {perda_ia:,.2f}")
 economia = perda_gerente - perda_ia
 print(f"\n🚀 DINHEIRO SALVO PELA IA: R$ {economia:,.2f}")
 print(f"   (Redução de {100 - (perda_ia/perda_gerente*100):.1f}% nas perdas)")
-print("=" * 60)
\ No newline at end of file
+
+# Onde a IA ainda perde dinheiro? Quebra por dia da semana numa passada só
+_, perda_por_dia = calcular_prejuizo_vetorizado(y_test, y_pred_final, custo_oportunidade, custo_estoque,
+                                                grupos=X_test['dia_semana'])
+print("\n📅 Prejuízo da IA por Dia da Semana:")
+for dia, valor in perda_por_dia.sort_values(ascending=False).items():
+    print(f"   {dia}: R$ {valor:,.2f}")
+
+# Faltar custa mais que sobrar -> a previsão de compra deve mirar ACIMA da mediana
+print(f"\n🎯 Quantil ótimo de compra (falta R$ {custo_oportunidade:.0f} x sobra R$ {custo_estoque:.0f}): "
+      f"{quantil_otimo(custo_oportunidade, custo_estoque):.1%} da demanda")
+print("=" * 60)
+
+if INSTRUMENTAR:
+    caminho_json = salvar_registro('instrumentacao_demanda.json', {'script': 'demanda', 'linhas_treino': len(X_train)})
+    print(f"🩺 Tempo por etapa salvo em {caminho_json}")
@@ -0,0 +1,215 @@
+import time
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.pipeline import Pipeline
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import StandardScaler, OneHotEncoder
+from sklearn.metrics import mean_absolute_error, mean_squared_error
+from xgboost import XGBRegressor
+
+from retail_pipelines import DEMANDA_NUMERIC_FEATURES, DEMANDA_CATEGORICAL_FEATURES, DEMANDA_TARGET
+
+# ==============================================================================
+# 🌐 MODELO GLOBAL DE DEMANDA (MILHARES DE SÉRIES SKU x LOJA)
+# ==============================================================================
+# O demand_forecasting_regressao.py trata cada linha como independente: não tem
+# SKU, loja nem data. Em produção é UM modelo para todas as séries SKU x LOJA,
+# alimentado pelo histórico de cada série:
+# - Lags e médias móveis calculados por série SEM loop por série: a base fica
+#   ordenada por (sku, loja, data) e tudo vira deslocamento de array + soma
+#   acumulada (média de janela = diferença de dois pontos do cumsum);
+# - Features de calendário (dia da semana, mês, dia do mês...);
+# - Mesmo preprocessor (scaler + onehot) + XGBRegressor do script;
+# - Backtest com origem móvel: vários cortes no tempo, cada um em paralelo.
+#
+# Regra anti-vazamento: toda feature de histórico olha pelo menos HORIZONTE dias
+# para trás. No dia do corte o modelo prevê a semana inteira só com o que já se sabia.
+
+CHAVES_SERIE = ['sku', 'loja']
+COLUNA_DATA = 'data'
+HORIZONTE = 7                 # Dias à frente que a compra precisa cobrir
+LAGS = (7, 14, 28)            # Todos >= HORIZONTE
+JANELAS = (7, 28)             # Médias móveis terminando HORIZONTE dias atrás
+FEATURES_CALENDARIO = ['mes', 'dia_mes', 'fim_de_semana']
+PARAMS_XGB = {'n_estimators': 200, 'learning_rate': 0.1, 'max_depth': 8, 'random_state': 42}
+
+
+def gerar_painel_demanda(n_skus=200, n_lojas=10, n_dias=365, data_inicial='2025-01-01', semente=42):
+    # Mesmas variáveis e efeitos do script (preço, marketing, fim de semana, frio)
+    # + nível próprio de cada série e uma tendência lenta (é isso que os lags capturam)
+    rng = np.random.default_rng(semente)
+    n_series = n_skus * n_lojas
+    datas = pd.date_range(data_inicial, periods=n_dias, freq='D')
+
+    # Painel "longo" já ordenado por (sku, loja, data)
+    sku = np.repeat(np.arange(n_skus, dtype=np.int32), n_lojas * n_dias)
+    loja = np.tile(np.repeat(np.arange(n_lojas, dtype=np.int32), n_dias), n_skus)
+    serie = np.repeat(np.arange(n_series), n_dias)
+    dia = np.tile(np.arange(n_dias), n_series)
+
+    # Clima é da data (igual para todas as lojas), marketing é da data x sku
+    temperatura = 25 + 8 * np.cos(2 * np.pi * (np.arange(n_dias) - 15) / 365) + rng.normal(0, 2, n_dias)
+    marketing = rng.uniform(500, 5000, (n_skus, n_dias))
+
+    preco_base = rng.uniform(50, 200, n_skus)
+    nivel_serie = rng.lognormal(0, 0.5, n_series)
+    tendencia = rng.normal(0, 0.3, n_series)
+
+    dias_semana = np.array(['Seg', 'Ter', 'Qua', 'Qui', 'Sex', 'Sab', 'Dom'], dtype=object)
+    df = pd.DataFrame({
+        'sku': sku,
+        'loja': loja,
+        COLUNA_DATA: np.tile(datas.to_numpy(), n_series),
+        'investimento_marketing': marketing[sku, dia],
+        'preco_produto': preco_base[sku] * rng.uniform(0.85, 1.0, len(sku)),
+        'dia_semana': dias_semana[datas.dayofweek.to_numpy()][dia],
+        'feriado': (rng.random(n_dias) < 0.05).astype(np.int64)[dia],
+        'temperatura_media': temperatura[dia],
+        'concorrente_em_promocao': rng.integers(0, 2, len(sku)),
+    })
+
+    efeito_preco = (200 - df['preco_produto']) * 0.8
+    efeito_mkt = np.log(df['investimento_marketing']) * 10
+    efeito_fds = df['dia_semana'].isin(['Sab', 'Dom']).astype(int) * 30
+    efeito_temp = (35 - df['temperatura_media']) * 2
+    base = 100 + efeito_preco + efeito_mkt + efeito_fds + efeito_temp
+    demanda = base * nivel_serie[serie] * (1 + tendencia[serie] * dia / n_dias) + rng.normal(0, 15, len(sku))
+    df[DEMANDA_TARGET] = np.maximum(0, demanda).astype(np.int64)
+    return df
+
+
+def _posicao_na_serie(df):
+    # Código da série + posição de cada linha dentro dela (0, 1, 2, ...)
+    codigos = df.groupby(CHAVES_SERIE, sort=False).ngroup().to_numpy()
+    mudou = np.r_[True, codigos[1:] != codigos[:-1]]
+    inicios = np.flatnonzero(mudou)
+    tamanhos = np.diff(np.r_[inicios, len(codigos)])
+    return np.arange(len(codigos)) - np.repeat(inicios, tamanhos)
+
+
+def criar_features_temporais(df, coluna_alvo=DEMANDA_TARGET, lags=LAGS, janelas=JANELAS, deslocamento=HORIZONTE):
+    # Pré-requisito: uma linha por série por dia, ordenada por (sku, loja, data).
+    # Primeiros dias de cada série (sem histórico suficiente) ficam NaN: o XGBoost lida.
+    df = df.sort_values(CHAVES_SERIE + [COLUNA_DATA], kind='stable', ignore_index=True)
+    y = df[coluna_alvo].to_numpy(dtype=np.float64)
+    posicao = _posicao_na_serie(df)
+
+    for lag in lags:
+        valores = np.full(len(y), np.nan, dtype=np.float32)
+        valores[lag:] = y[:-lag]
+        valores[posicao < lag] = np.nan          # Não deixa o lag "pular" para a série anterior
+        df[f'lag_{lag}'] = valores
+
+    # Média de y[t-deslocamento-janela+1 .. t-deslocamento]: dois acessos ao cumsum por linha
+    acumulado = np.r_[0.0, np.cumsum(y)]
+    indices = np.arange(len(y))
+    for janela in janelas:
+        fim = indices - deslocamento + 1
+        ini = fim - janela
+        valores = np.full(len(y), np.nan, dtype=np.float32)
+        validos = posicao >= deslocamento + janela - 1
+        valores[validos] = (acumulado[fim[validos]] - acumulado[ini[validos]]) / janela
+        df[f'media_{janela}d'] = valores
+
+    datas = pd.DatetimeIndex(df[COLUNA_DATA])
+    df['mes'] = datas.month.astype(np.int8)
+    df['dia_mes'] = datas.day.astype(np.int8)
+    df['fim_de_semana'] = (datas.dayofweek >= 5).astype(np.int8)
+    return df
+
+
+def features_do_modelo(lags=LAGS, janelas=JANELAS):
+    numericas = (DEMANDA_NUMERIC_FEATURES + [f'lag_{lag}' for lag in lags]
+                 + [f'media_{janela}d' for janela in janelas] + FEATURES_CALENDARIO)
+    return numericas, DEMANDA_CATEGORICAL_FEATURES
+
+
+def construir_modelo_global(n_threads=None, lags=LAGS, janelas=JANELAS):
+    # Mesma receita do script (scaler nas numéricas, onehot no dia da semana) + XGBRegressor
+    numericas, categoricas = features_do_modelo(lags, janelas)
+    preprocessor = ColumnTransformer(
+        transformers=[
+            ('num', Pipeline(steps=[('scaler', StandardScaler())]), numericas),
+            ('cat', Pipeline(steps=[('onehot', OneHotEncoder(handle_unknown='ignore'))]), categoricas)
+        ])
+    return Pipeline(steps=[
+        ('preprocessor', preprocessor),
+        ('regressor', XGBRegressor(**PARAMS_XGB, n_jobs=n_threads))
+    ])
+
+
+def _avaliar_origem(df, origem, horizonte, n_threads):
+    inicio = time.perf_counter()
+    treino = df[COLUNA_DATA] < origem
+    teste = (df[COLUNA_DATA] >= origem) & (df[COLUNA_DATA] < origem + pd.Timedelta(days=horizonte))
+
+    modelo = construir_modelo_global(n_threads)
+    modelo.fit(df.loc[treino], df.loc[treino, DEMANDA_TARGET])
+    reais = df.loc[teste, DEMANDA_TARGET].to_numpy()
+    previstos = modelo.predict(df.loc[teste])
+
+    # Baseline ingênuo sazonal: "vai vender o mesmo que há 7 dias"
+    ingenuo = df.loc[teste, f'lag_{horizonte}'].to_numpy()
+    return {
+        'origem': origem.date(),
+        'linhas_treino': int(treino.sum()),
+        'linhas_teste': int(teste.sum()),
+        'rmse': np.sqrt(mean_squared_error(reais, previstos)),
+        'mae': mean_absolute_error(reais, previstos),
+        'wape': np.abs(reais - previstos).sum() / reais.sum(),
+        'rmse_ingenuo': np.sqrt(mean_squared_error(reais, ingenuo)),
+        'tempo_s': time.perf_counter() - inicio,
+    }
+
+
+def backtest_origem_movel(df, n_origens=4, horizonte=HORIZONTE, passo_dias=None, n_jobs=-1):
+    # df já com features (criar_features_temporais). Origens: as últimas n_origens
+    # semanas, da mais antiga para a mais recente; cada corte treina no passado e testa
+    # nos "horizonte" dias seguintes. Cortes são independentes -> um processo por corte.
+    passo_dias = passo_dias or horizonte
+    ultima_data = df[COLUNA_DATA].max()
+    origens = [ultima_data - pd.Timedelta(days=horizonte - 1 + passo_dias * i) for i in reversed(range(n_origens))]
+
+    # Threads do XGBoost só quando os cortes rodam em série (evita disputa de núcleos)
+    n_threads = None if n_jobs == 1 else 1
+    resultados = Parallel(n_jobs=n_jobs)(
+        delayed(_avaliar_origem)(df, origem, horizonte, n_threads) for origem in origens
+    )
+    return pd.DataFrame(resultados)
+
+
+def _features_por_loop(df, coluna_alvo=DEMANDA_TARGET, lags=LAGS, janelas=JANELAS, deslocamento=HORIZONTE):
+    # Referência "ingênua": groupby + shift/rolling por série (usada só para validar a paridade)
+    df = df.sort_values(CHAVES_SERIE + [COLUNA_DATA], kind='stable', ignore_index=True)
+    grupos = df.groupby(CHAVES_SERIE, sort=False)[coluna_alvo]
+    saida = {}
+    for lag in lags:
+        saida[f'lag_{lag}'] = grupos.shift(lag)
+    for janela in janelas:
+        saida[f'media_{janela}d'] = grupos.transform(
+            lambda s: s.shift(deslocamento).rolling(janela, min_periods=janela).mean())
+    return pd.DataFrame(saida)
+
+
+if __name__ == "__main__":
+    print("🌐 Gerando painel SKU x LOJA x DIA...")
+    painel = gerar_painel_demanda(n_skus=200, n_lojas=10, n_dias=365)
+    print(f"📊 {len(painel):,} linhas | {painel.groupby(CHAVES_SERIE).ngroups:,} séries")
+
+    inicio = time.perf_counter()
+    painel = criar_features_temporais(painel)
+    tempo_vetorizado = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    referencia = _features_por_loop(painel)
+    tempo_loop = time.perf_counter() - inicio
+    iguais = all(np.allclose(painel[c].to_numpy(dtype=np.float64), referencia[c].to_numpy(), equal_nan=True,
+                             rtol=1e-6) for c in referencia.columns)
+    print(f"⚡ Features: vetorizado {tempo_vetorizado:.2f}s | groupby/rolling {tempo_loop:.2f}s | "
+          f"mesmos valores: {iguais}")
+
+    print(f"\n🔁 Backtest com origem móvel (horizonte {HORIZONTE} dias):")
+    placar = backtest_origem_movel(painel, n_origens=4)
+    print(placar.round(3).to_string(index=False))
+    print(f"\n🏆 RMSE médio: {placar['rmse'].mean():.2f} | Baseline sazonal: {placar['rmse_ingenuo'].mean():.2f}")
@@ -0,0 +1,184 @@
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.pipeline import Pipeline
+from xgboost import XGBClassifier, XGBRegressor
+
+# ==============================================================================
+# 🗜️ TIPOS COMPACTOS + CATEGORIAS NATIVAS NO XGBOOST
+# ==============================================================================
+# Os scripts deixam tudo no tipo padrão do pandas: float64, int64 e texto como
+# 'object' (um objeto Python por célula!). E antes do XGBoost tudo passa por um
+# OneHotEncoder, que multiplica as colunas. Aqui:
+# - float64 -> float32 (o XGBoost trabalha em float32 internamente de qualquer jeito);
+# - int64 -> o menor inteiro que cabe COM FOLGA (int8/int16/int32): a produção pode
+#   trazer valores fora da faixa do treino;
+# - texto com poucos valores distintos -> 'category' (códigos inteiros + dicionário);
+# - XGBoost com enable_categorical=True lê a 'category' direto: sem one-hot.
+# Os tipos escolhidos no treino ficam num dicionário e são REAPLICADOS na produção
+# (mesmas categorias, na mesma ordem), senão os códigos não batem. Em bases grandes,
+# passe o dicionário direto na leitura (pd.read_csv(..., dtype=tipos)): assim a
+# versão 'object' da coluna nem chega a existir na memória.
+#
+# Nos scripts (flag TIPOS_COMPACTOS): construir_pipeline_nativo monta o Pipeline
+# com TiposCompactos no lugar do ColumnTransformer, então salvar, pontuar em lote
+# e instrumentar funcionam igual.
+
+LIMITE_CATEGORIA = 0.5      # Vira 'category' se valores distintos <= 50% das linhas
+FOLGA_INTEIROS = 4          # O tipo inteiro precisa caber 4x o maior valor absoluto do treino
+
+
+def _menor_inteiro(serie, folga=FOLGA_INTEIROS):
+    # idade 20-90 -> cabe 360 -> int16 (não int8: um 200 na produção não pode virar -56)
+    if serie.empty:
+        return np.dtype(np.int64)
+    limite = max(abs(int(serie.min())), abs(int(serie.max())), 1) * folga
+    for tipo in (np.int8, np.int16, np.int32):
+        if limite <= np.iinfo(tipo).max:
+            return np.dtype(tipo)
+    return np.dtype(np.int64)
+
+
+def escolher_tipos(df, limite_categoria=LIMITE_CATEGORIA, ignorar=()):
+    tipos = {}
+    for coluna in df.columns:
+        serie = df[coluna]
+        if coluna in ignorar:
+            continue
+        if pd.api.types.is_float_dtype(serie):
+            tipos[coluna] = np.float32
+        elif pd.api.types.is_integer_dtype(serie):
+            tipos[coluna] = _menor_inteiro(serie)
+        elif pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(serie):
+            categorias = serie.dropna().unique()
+            if len(categorias) <= limite_categoria * len(serie):
+                tipos[coluna] = pd.CategoricalDtype(categories=np.sort(categorias.astype(str)))
+    return tipos
+
+
+def _conferir_inteiros(df, tipos):
+    # astype para int não avisa: 200 em int8 vira -56 e nulo quebra com IntCastingNaNError.
+    # Melhor parar com uma mensagem clara do que pontuar a base com dados corrompidos.
+    for coluna, tipo in tipos.items():
+        if coluna not in df.columns or isinstance(tipo, pd.CategoricalDtype):
+            continue
+        tipo = np.dtype(tipo)
+        if not np.issubdtype(tipo, np.integer):
+            continue
+        serie = df[coluna]
+        if serie.isna().any():
+            raise ValueError(f"Coluna '{coluna}' tem valores nulos e não cabe em {tipo}: "
+                             "refaça o escolher_tipos com esses dados ou trate os nulos antes")
+        faixa = np.iinfo(tipo)
+        minimo, maximo = serie.min(), serie.max()
+        if minimo < faixa.min or maximo > faixa.max:
+            raise ValueError(f"Coluna '{coluna}' tem valores [{minimo}, {maximo}] fora da faixa de "
+                             f"{tipo} [{faixa.min}, {faixa.max}]")
+
+
+def aplicar_tipos(df, tipos):
+    # Valor que não existia no treino vira NaN na categoria (o XGBoost trata como ausente).
+    # Inteiro fora da faixa ou nulo levanta ValueError (em vez de virar lixo em silêncio).
+    _conferir_inteiros(df, tipos)
+    return df.astype({coluna: tipo for coluna, tipo in tipos.items() if coluna in df.columns})
+
+
+def otimizar_tipos(df, limite_categoria=LIMITE_CATEGORIA, ignorar=()):
+    tipos = escolher_tipos(df, limite_categoria, ignorar)
+    return aplicar_tipos(df, tipos), tipos
+
+
+def relatorio_memoria(df_antes, df_depois):
+    antes = df_antes.memory_usage(deep=True, index=False)
+    depois = df_depois.memory_usage(deep=True, index=False)
+    relatorio = pd.DataFrame({
+        'tipo_antes': df_antes.dtypes.astype(str),
+        'tipo_depois': df_depois.dtypes.astype(str),
+        'mb_antes': antes / 1024 ** 2,
+        'mb_depois': depois / 1024 ** 2,
+    })
+    relatorio.loc['TOTAL', ['mb_antes', 'mb_depois']] = relatorio[['mb_antes', 'mb_depois']].sum()
+    relatorio['reducao'] = relatorio['mb_antes'] / relatorio['mb_depois']
+    return relatorio
+
+
+def construir_xgb_nativo(tarefa='classificacao', **params):
+    # Sem preprocessor: o XGBoost recebe o DataFrame otimizado direto
+    modelo = XGBClassifier if tarefa == 'classificacao' else XGBRegressor
+    return modelo(tree_method='hist', enable_categorical=True, **params)
+
+
+class TiposCompactos(BaseEstimator, TransformerMixin):
+    # Etapa 'preprocessor' do caminho nativo: separa as features do modelo e aplica
+    # os tipos escolhidos no fit (os mesmos na produção)
+
+    def __init__(self, features, limite_categoria=LIMITE_CATEGORIA):
+        self.features = features
+        self.limite_categoria = limite_categoria
+
+    def fit(self, X, y=None):
+        self.tipos_ = escolher_tipos(X[list(self.features)], self.limite_categoria)
+        return self
+
+    def transform(self, X):
+        return aplicar_tipos(X[list(self.features)], self.tipos_)
+
+    def get_feature_names_out(self, input_features=None):
+        return np.asarray(self.features, dtype=object)
+
+
+def construir_pipeline_nativo(features, tarefa='classificacao', nome_etapa='classifier', **params):
+    # Mesmo formato dos Pipelines dos scripts: ('preprocessor', ...) + (nome_etapa, modelo)
+    return Pipeline(steps=[('preprocessor', TiposCompactos(features)),
+                           (nome_etapa, construir_xgb_nativo(tarefa, **params))])
+
+
+if __name__ == "__main__":
+    # Benchmark: pipeline atual (float64/object + one-hot) x tipos compactos + categoria nativa
+    import time
+    import tracemalloc
+    from synthetic_data_factory import gerar_em_memoria
+    from retail_pipelines import (construir_preprocessor_churn, construir_preprocessor_demanda,
+                                  CHURN_TARGET, CHURN_NUMERIC_FEATURES, CHURN_CATEGORICAL_FEATURES,
+                                  DEMANDA_TARGET, DEMANDA_NUMERIC_FEATURES, DEMANDA_CATEGORICAL_FEATURES)
+
+    def medir(funcao):
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempo = time.perf_counter() - inicio
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return resultado, tempo, pico / 1024 ** 2
+
+    n_linhas = 2_000_000
+    casos = [
+        ('churn', CHURN_TARGET, CHURN_NUMERIC_FEATURES + CHURN_CATEGORICAL_FEATURES,
+         construir_preprocessor_churn, 'classificacao',
+         {'n_estimators': 100, 'learning_rate': 0.1, 'scale_pos_weight': 5, 'random_state': 42}),
+        ('demanda', DEMANDA_TARGET, DEMANDA_NUMERIC_FEATURES + DEMANDA_CATEGORICAL_FEATURES,
+         construir_preprocessor_demanda, 'regressao',
+         {'n_estimators': 100, 'learning_rate': 0.1, 'random_state': 42}),
+    ]
+    for nome, alvo, features, construir_preprocessor, tarefa, params in casos:
+        print(f"\n🗜️ {nome.upper()} ({n_linhas:,} linhas)")
+        df = gerar_em_memoria(nome, n_linhas).drop(columns='id_cliente', errors='ignore')
+
+        # Conversão também entra na conta de memória: é o caminho real de produção
+        (df_otimizado, tipos), tempo_conversao, pico_conversao = medir(lambda: otimizar_tipos(df, ignorar=[alvo]))
+        print(relatorio_memoria(df, df_otimizado).round(2).to_string())
+
+        # Os dois caminhos treinam nas MESMAS features: as que o preprocessor usa
+        # (colunas fora da lista, como 'feriado', o ColumnTransformer descarta)
+        X, y = df[features], df[alvo]
+        X_otim, y_otim = df_otimizado[features], df_otimizado[alvo]
+        modelo_classe = XGBClassifier if tarefa == 'classificacao' else XGBRegressor
+        atual = Pipeline(steps=[('preprocessor', construir_preprocessor()), ('modelo', modelo_classe(**params))])
+        nativo = construir_xgb_nativo(tarefa, **params)
+
+        _, tempo_atual, pico_atual = medir(lambda: atual.fit(X, y))
+        _, tempo_nativo, pico_nativo = medir(lambda: nativo.fit(X_otim, y_otim))
+        print(f"   Fit atual (float64 + one-hot):   {tempo_atual:6.2f}s | pico {pico_atual:7.0f} MB")
+        print(f"   Fit nativo (compacto + category): {tempo_nativo:6.2f}s | pico {pico_nativo:7.0f} MB "
+              f"(+ conversão {tempo_conversao:.2f}s / {pico_conversao:.0f} MB)")
+        print(f"   Pico de memória {pico_atual / max(pico_nativo, pico_conversao):.1f}x menor")
@@ -0,0 +1,79 @@
+import time
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed, parallel_config
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import silhouette_score
+
+# ==============================================================================
+# 💪 MÉTODO DO COTOVELO EM PARALELO (E EM AMOSTRA)
+# ==============================================================================
+# No script, cada K (1 a 10) é treinado um depois do outro, na base inteira.
+# Com milhões de clientes isso demora mais que o próprio modelo final. Aqui:
+# - Cada K roda num processo separado (joblib), todos ao mesmo tempo;
+# - Opcional: treina numa AMOSTRA ESTRATIFICADA e/ou com MiniBatchKMeans;
+# - Devolve a inércia (comparável à base cheia) e a silhueta (em amostra).
+# O K escolhido é retreinado UMA vez na base inteira, fora daqui.
+
+AMOSTRA_SILHOUETTE = 10_000   # Silhueta é O(n²): sempre calculada em amostra
+
+
+def amostra_estratificada(X, tamanho, n_faixas=5, semente=42):
+    # Estratos = combinação das faixas (quintis) de cada coluna. Cada estrato
+    # entra na amostra na mesma proporção que tem na base: os VIPs raros não somem.
+    X = np.asarray(X)
+    if tamanho >= len(X):
+        return X
+    rng = np.random.default_rng(semente)
+
+    estrato = np.zeros(len(X), dtype=np.int64)
+    for j in range(X.shape[1]):
+        cortes = np.quantile(X[:, j], np.linspace(0, 1, n_faixas + 1)[1:-1])
+        estrato = estrato * n_faixas + np.searchsorted(cortes, X[:, j])
+
+    # Embaralha dentro de cada estrato e pega os primeiros "fração x tamanho do estrato"
+    ordem = np.lexsort((rng.random(len(X)), estrato))
+    estrato_ord = estrato[ordem]
+    inicio_estrato = np.searchsorted(estrato_ord, estrato_ord, side='left')
+    posicao = np.arange(len(X)) - inicio_estrato
+    _, contagem = np.unique(estrato_ord, return_counts=True)
+    tamanho_estrato = np.repeat(contagem, contagem)
+    cota = np.ceil(tamanho_estrato * tamanho / len(X))
+    return X[ordem[posicao < cota]]
+
+
+def _avaliar_k(X_treino, k, usar_minibatch, X_silhouette, fator_inercia, semente):
+    inicio = time.perf_counter()
+    if usar_minibatch:
+        modelo = MiniBatchKMeans(n_clusters=k, random_state=semente, n_init=3, batch_size=4096)
+    else:
+        modelo = KMeans(n_clusters=k, random_state=semente, n_init=10)
+    modelo.fit(X_treino)
+    tempo = time.perf_counter() - inicio
+
+    silhueta = np.nan  # Não existe silhueta com 1 grupo só
+    if k > 1:
+        rotulos = modelo.predict(X_silhouette)
+        if len(np.unique(rotulos)) > 1:
+            silhueta = silhouette_score(X_silhouette, rotulos)
+
+    return {'k': k, 'inercia': modelo.inertia_ * fator_inercia, 'silhueta': silhueta, 'tempo_s': tempo}
+
+
+def buscar_k_paralelo(X, range_k=range(1, 11), n_jobs=-1, tamanho_amostra=None, usar_minibatch=False,
+                      amostra_silhouette=AMOSTRA_SILHOUETTE, semente=42, threads_por_worker=1):
+    X = np.asarray(X)
+    X_treino = X if tamanho_amostra is None else amostra_estratificada(X, tamanho_amostra, semente=semente)
+    X_silhouette = amostra_estratificada(X, amostra_silhouette, semente=semente + 1)
+
+    # Inércia na amostra é proporcional ao nº de pontos: reescala para a base cheia
+    fator_inercia = len(X) / len(X_treino)
+
+    # Um K por processo, cada um limitado a threads_por_worker threads de OpenMP/BLAS
+    # (senão cada KMeans usa todos os núcleos: n_jobs x núcleos threads disputando a máquina)
+    with parallel_config(backend='loky', inner_max_num_threads=threads_por_worker):
+        resultados = Parallel(n_jobs=n_jobs)(
+            delayed(_avaliar_k)(X_treino, k, usar_minibatch, X_silhouette, fator_inercia, semente)
+            for k in range_k
+        )
+    return pd.DataFrame(resultados)
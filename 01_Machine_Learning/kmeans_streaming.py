@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from sklearn.preprocessing import StandardScaler
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import adjusted_rand_score
+
+from rfm_engine import calcular_rfm
+
+# ==============================================================================
+# 🌊 SEGMENTAÇÃO EM STREAMING (BASE DE FIDELIDADE INTEIRA, TODA NOITE)
+# ==============================================================================
+# O KMeans do script precisa da matriz RFM inteira na RAM. Para 100 milhões de
+# clientes trocamos por:
+# 1. StandardScaler.partial_fit -> média/desvio acumulados chunk a chunk;
+# 2. MiniBatchKMeans.partial_fit -> centróides ajustados chunk a chunk (várias épocas);
+# 3. predict chunk a chunk -> cada cliente recebe seu grupo sem juntar a base.
+# A qualidade é conferida contra o KMeans completo numa subamostra.
+
+COLUNAS_RFM = ['Recencia', 'Frequencia', 'Monetario']
+TAMANHO_CHUNK = 500_000
+N_EPOCAS = 3
+TAMANHO_LOTE = 10_000              # Linhas por passo do partial_fit
+TAMANHO_AMOSTRA_INICIAL = 100_000  # Amostra usada para posicionar os centróides iniciais
+
+
+def particoes_rfm(caminho_estado, data_referencia, tamanho_chunk=TAMANHO_CHUNK):
+    # Lê o estado salvo pelo rfm_engine em pedaços. A data de referência é FIXA
+    # (global): se cada chunk usasse a própria última data, a Recência mudaria de régua.
+    arquivo = pq.ParquetFile(caminho_estado)
+    for lote in arquivo.iter_batches(batch_size=tamanho_chunk):
+        estado = lote.to_pandas()
+        if 'id_cliente' in estado.columns:
+            estado = estado.set_index('id_cliente')
+        yield calcular_rfm(estado, data_referencia)
+
+
+def ajustar_scaler_em_streaming(fonte_chunks):
+    scaler = StandardScaler()
+    for chunk in fonte_chunks():
+        scaler.partial_fit(chunk[COLUNAS_RFM].to_numpy(dtype=np.float64))
+    return scaler
+
+
+def ajustar_minibatch_em_streaming(fonte_chunks, scaler, k, n_epocas=N_EPOCAS, semente=42):
+    rng = np.random.default_rng(semente)
+    modelo = None
+    for _ in range(n_epocas):
+        for chunk in fonte_chunks():
+            X = scaler.transform(chunk[COLUNAS_RFM].to_numpy(dtype=np.float64))
+            if modelo is None:
+                # Partida: KMeans completo numa amostra do 1º chunk. Inicializar o
+                # MiniBatch "no escuro" (k-means++ num lote só) derruba a qualidade.
+                amostra = X[rng.choice(len(X), min(len(X), TAMANHO_AMOSTRA_INICIAL), replace=False)]
+                centros = KMeans(n_clusters=k, random_state=semente, n_init=10).fit(amostra).cluster_centers_
+                modelo = MiniBatchKMeans(n_clusters=k, init=centros, n_init=1, random_state=semente)
+            # Vários passos pequenos por chunk (embaralhados) em vez de um passo gigante
+            for lote in np.array_split(rng.permutation(X), max(1, len(X) // TAMANHO_LOTE)):
+                modelo.partial_fit(lote)
+    return modelo
+
+
+def segmentar_em_streaming(fonte_chunks, k, n_epocas=N_EPOCAS, semente=42):
+    # fonte_chunks: função que devolve um gerador NOVO de DataFrames RFM (uma passada por chamada)
+    scaler = ajustar_scaler_em_streaming(fonte_chunks)
+    modelo = ajustar_minibatch_em_streaming(fonte_chunks, scaler, k, n_epocas, semente)
+    return scaler, modelo
+
+
+def prever_em_streaming(fonte_chunks, scaler, modelo):
+    # Gera (DataFrame RFM do chunk + coluna Cluster), um chunk de cada vez
+    for chunk in fonte_chunks():
+        rotulos = modelo.predict(scaler.transform(chunk[COLUNAS_RFM].to_numpy(dtype=np.float64)))
+        yield chunk.assign(Cluster=rotulos)
+
+
+def comparar_com_kmeans(scaler, modelo, amostra_rfm, semente=42):
+    # Mesma subamostra, mesma escala: KMeans completo x MiniBatch em streaming
+    X = scaler.transform(amostra_rfm[COLUNAS_RFM].to_numpy(dtype=np.float64))
+    referencia = KMeans(n_clusters=modelo.n_clusters, random_state=semente, n_init=10).fit(X)
+
+    rotulos_stream = modelo.predict(X)
+    inercia_stream = float(np.sum((X - modelo.cluster_centers_[rotulos_stream]) ** 2))
+    return {
+        'inercia_kmeans': float(referencia.inertia_),
+        'inercia_streaming': inercia_stream,
+        'inercia_relativa': inercia_stream / referencia.inertia_,  # 1.00 = tão bom quanto o completo
+        'concordancia_ari': float(adjusted_rand_score(referencia.labels_, rotulos_stream)),
+    }
+
+
+if __name__ == "__main__":
+    from synthetic_data_factory import gerar_chunk, DATA_REFERENCIA
+    from rfm_engine import rfm_em_streaming, salvar_estado
+
+    # 1. Estado RFM de 1 milhão de clientes, montado em streaming (20 partições de vendas)
+    n_transacoes, n_particoes = 10_000_000, 20
+    particoes_vendas = (gerar_chunk('transacoes', i, n_transacoes, n_transacoes // n_particoes,
+                                    n_clientes=1_000_000) for i in range(n_particoes))
+    salvar_estado(rfm_em_streaming(particoes_vendas), 'estado_rfm.parquet')
+
+    # 2. Segmentação sem nunca juntar a matriz inteira
+    fonte = lambda: particoes_rfm('estado_rfm.parquet', DATA_REFERENCIA)
+    scaler, modelo = segmentar_em_streaming(fonte, k=4)
+    contagem = pd.concat(chunk['Cluster'].value_counts() for chunk in prever_em_streaming(fonte, scaler, modelo))
+    print("👥 Clientes por grupo:")
+    print(contagem.groupby(level=0).sum())
+
+    # 3. Qualidade x KMeans completo numa subamostra de 100 mil clientes
+    amostra = next(particoes_rfm('estado_rfm.parquet', DATA_REFERENCIA, tamanho_chunk=100_000))
+    print("🧪 Qualidade vs KMeans completo:", comparar_com_kmeans(scaler, modelo, amostra))
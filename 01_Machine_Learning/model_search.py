@@ -0,0 +1,175 @@
+import time
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed, parallel_config
+from sklearn.base import clone
+from sklearn.pipeline import Pipeline
+from sklearn.model_selection import ParameterGrid
+from sklearn.metrics import get_scorer
+
+# ==============================================================================
+# 🗂️ BUSCA DE HIPERPARÂMETROS COM CACHE DE FOLDS
+# ==============================================================================
+# No GridSearchCV com Pipeline, CADA candidato (modelo x parâmetros) reajusta o
+# MESMO pré-processador nos MESMOS folds. Como o pré-processador não tem
+# hiperparâmetro no grid, isso é trabalho repetido. Aqui:
+# 1. Cada fold é transformado UMA vez (treino e validação) e fica em memória;
+# 2. Todos os modelos e combinações de parâmetros treinam direto nas matrizes prontas;
+# 3. O campeão é remontado como Pipeline(preprocessor + modelo) para produção.
+# O custo do pré-processamento vira constante: nº de folds + 1, não importa
+# quantos candidatos entrem no torneio.
+
+
+def construir_cache_folds(preprocessor, X, y, cv):
+    # cv: objeto splitter (KFold/StratifiedKFold), o mesmo que o GridSearchCV usaria
+    inicio = time.perf_counter()
+    folds = []
+    for indices_treino, indices_valid in cv.split(X, y):
+        prep = clone(preprocessor)
+        folds.append({
+            'X_treino': prep.fit_transform(X.iloc[indices_treino]),
+            'y_treino': y.iloc[indices_treino].to_numpy(),
+            'X_valid': prep.transform(X.iloc[indices_valid]),
+            'y_valid': y.iloc[indices_valid].to_numpy(),
+        })
+
+    # Base de treino inteira: usada no refit do campeão
+    prep_completo = clone(preprocessor)
+    X_completo = prep_completo.fit_transform(X)
+    return {
+        'folds': folds,
+        'preprocessor': prep_completo,
+        'X': X_completo,
+        'y': y.to_numpy(),
+        'tempo_preprocessamento_s': time.perf_counter() - inicio,
+    }
+
+
+def _avaliar_candidato(estimator, params, fold, scoring):
+    modelo = clone(estimator).set_params(**params)
+    inicio = time.perf_counter()
+    modelo.fit(fold['X_treino'], fold['y_treino'])
+    tempo_fit = time.perf_counter() - inicio
+    return get_scorer(scoring)(modelo, fold['X_valid'], fold['y_valid']), tempo_fit
+
+
+def montar_campeao(estimator, params, cache, nome_etapa='regressor'):
+    # Refit na base de treino inteira (já transformada) e remonta o Pipeline de produção
+    modelo = clone(estimator).set_params(**_sem_prefixo(params, nome_etapa)).fit(cache['X'], cache['y'])
+    return Pipeline(steps=[('preprocessor', cache['preprocessor']), (nome_etapa, modelo)])
+
+
+# ==============================================================================
+# 🧮 UM POOL SÓ PARA O TORNEIO INTEIRO (SEM PARALELISMO ANINHADO)
+# ==============================================================================
+# Rodar um GridSearchCV(n_jobs=-1) por modelo tem dois problemas em máquina grande:
+# - Entre um modelo e outro o pool esvazia (o último fold lento segura todo mundo);
+# - Dentro de cada processo, XGBoost/BLAS abrem UMA thread por núcleo: com 64
+#   processos x 64 threads a máquina afoga (oversubscription).
+# Aqui todas as tarefas (modelo x parâmetros x fold) do torneio vão para a MESMA
+# fila, e cada worker fica limitado a threads_por_worker threads de OpenMP/BLAS.
+
+def _sem_prefixo(params, nome_etapa):
+    # Aceita o grid no formato do GridSearchCV com Pipeline ('classifier__C') ou direto ('C')
+    prefixo = f'{nome_etapa}__'
+    return {chave[len(prefixo):] if chave.startswith(prefixo) else chave: valor for chave, valor in params.items()}
+
+
+def avaliar_modelos_em_pool(modelos, cache, scoring, nome_etapa='regressor', n_jobs=-1, threads_por_worker=1):
+    # modelos: a mesma lista de {'nome', 'estimator', 'params'} dos scripts
+    candidatos = _listar_candidatos(modelos)
+    n_folds = len(cache['folds'])
+    with parallel_config(backend='loky', inner_max_num_threads=threads_por_worker):
+        resultados = Parallel(n_jobs=n_jobs)(
+            delayed(_avaliar_candidato)(c['estimator'], _sem_prefixo(c['params'], nome_etapa), fold, scoring)
+            for c in candidatos for fold in cache['folds']
+        )
+
+    scores = np.array([score for score, _ in resultados]).reshape(len(candidatos), n_folds)
+    tempos = np.array([tempo for _, tempo in resultados]).reshape(len(candidatos), n_folds)
+    return pd.DataFrame({
+        'modelo': [c['modelo'] for c in candidatos],
+        'params': [c['params'] for c in candidatos],
+        'score_medio': scores.mean(axis=1),
+        'score_desvio': scores.std(axis=1),
+        'tempo_fit_medio_s': tempos.mean(axis=1),
+    })
+
+
+def melhores_por_modelo(tabela):
+    # Uma linha por modelo (na ordem da lista): a combinação de maior score médio.
+    # Empate: vence a primeira combinação do grid (mesma regra do GridSearchCV).
+    indices = tabela.groupby('modelo', sort=False)['score_medio'].idxmax()
+    return tabela.loc[indices].reset_index(drop=True)
+
+
+# ==============================================================================
+# ⏱️ TORNEIO POR ELIMINAÇÃO (SUCCESSIVE HALVING COM ORÇAMENTO DE TEMPO)
+# ==============================================================================
+# O grid exaustivo treina TODOS os candidatos na base inteira, inclusive os que
+# claramente vão perder (e os lentos, como o SVR). Aqui todos os candidatos de
+# TODOS os modelos disputam juntos:
+# - Rodada 0: todo mundo treina numa amostra pequena;
+# - A cada rodada só o melhor 1/fator passa, e a amostra cresce "fator" vezes;
+# - Cada modelo tem um orçamento de segundos de treino: estourou, sai do torneio
+#   (a checagem é entre rodadas, um fit em andamento não é interrompido).
+# A última rodada usa a base de treino inteira.
+
+def _listar_candidatos(modelos):
+    return [{'modelo': item['nome'], 'estimator': item['estimator'], 'params': params}
+            for item in modelos for params in ParameterGrid(item['params'])]
+
+
+def torneio_sucessivo(modelos, preprocessor, X, y, cv, scoring, fator=3, orcamento_por_modelo_s=60.0,
+                      min_amostras=None, semente=42, n_jobs=-1, threads_por_worker=1):
+    candidatos = _listar_candidatos(modelos)
+    n_rodadas = max(1, int(np.ceil(np.log(len(candidatos)) / np.log(fator))))
+    if min_amostras is None:
+        min_amostras = max(len(X) // fator ** (n_rodadas - 1), 50)
+
+    # Amostras aninhadas: a rodada i usa os primeiros n_i de uma única permutação
+    permutacao = np.random.default_rng(semente).permutation(len(X))
+    tempo_gasto = {item['nome']: 0.0 for item in modelos}
+    vivos = list(range(len(candidatos)))
+    registros = []
+
+    for rodada in range(n_rodadas):
+        # Quem estourou o orçamento sai antes de gastar mais
+        for i in [i for i in vivos if tempo_gasto[candidatos[i]['modelo']] >= orcamento_por_modelo_s]:
+            registros.append({**_registro(candidatos[i], rodada, 0), 'status': 'orçamento esgotado'})
+        vivos = [i for i in vivos if tempo_gasto[candidatos[i]['modelo']] < orcamento_por_modelo_s]
+        if not vivos:
+            break
+
+        n_amostras = len(X) if rodada == n_rodadas - 1 else min(len(X), min_amostras * fator ** rodada)
+        indices = np.sort(permutacao[:n_amostras])
+        cache = construir_cache_folds(preprocessor, X.iloc[indices], y.iloc[indices], cv)
+
+        # Mesmo limite do avaliar_modelos_em_pool: sem XGBoost/BLAS abrindo uma thread por núcleo em cada worker
+        with parallel_config(backend='loky', inner_max_num_threads=threads_por_worker):
+            resultados = Parallel(n_jobs=n_jobs)(
+                delayed(_avaliar_candidato)(candidatos[i]['estimator'], candidatos[i]['params'], fold, scoring)
+                for i in vivos for fold in cache['folds']
+            )
+        n_folds = len(cache['folds'])
+        scores = np.array([s for s, _ in resultados]).reshape(len(vivos), n_folds).mean(axis=1)
+        tempos = np.array([t for _, t in resultados]).reshape(len(vivos), n_folds).sum(axis=1)
+
+        # Passam os melhores 1/fator (na última rodada ninguém é eliminado)
+        n_passam = len(vivos) if rodada == n_rodadas - 1 else max(1, int(np.ceil(len(vivos) / fator)))
+        ordem = np.argsort(-scores, kind='stable')
+        passam = set(ordem[:n_passam].tolist())
+        for posicao, i in enumerate(vivos):
+            tempo_gasto[candidatos[i]['modelo']] += tempos[posicao]
+            status = 'finalista' if rodada == n_rodadas - 1 else ('avançou' if posicao in passam else 'eliminado')
+            registros.append({**_registro(candidatos[i], rodada, n_amostras),
+                              'score': scores[posicao], 'tempo_fit_s': tempos[posicao], 'status': status})
+        vivos = [vivos[posicao] for posicao in ordem[:n_passam]]
+
+    # Quem sobreviveu à última rodada (dentro do orçamento) é finalista
+    return pd.DataFrame(registros), [candidatos[i] for i in vivos]
+
+
+def _registro(candidato, rodada, n_amostras):
+    return {'modelo': candidato['modelo'], 'params': candidato['params'], 'rodada': rodada,
+            'n_amostras': n_amostras, 'score': np.nan, 'tempo_fit_s': 0.0}
@@ -0,0 +1,214 @@
+import os
+import json
+import time
+import tracemalloc
+from datetime import datetime
+
+import pandas as pd
+from sklearn.base import BaseEstimator, clone
+from sklearn.pipeline import Pipeline
+from sklearn.compose import ColumnTransformer
+from sklearn.utils.metaestimators import available_if
+from sklearn.utils.validation import check_is_fitted
+from sklearn.exceptions import NotFittedError
+
+# ==============================================================================
+# 🩺 INSTRUMENTAÇÃO POR ETAPA (ONDE VAI O TEMPO DO PIPELINE?)
+# ==============================================================================
+# Um fit do Pipeline é uma caixa-preta: o tempo foi no SimpleImputer, no
+# OneHotEncoder, no StandardScaler ou no modelo? Aqui cada etapa (inclusive as
+# de dentro do ColumnTransformer) é embrulhada numa EtapaInstrumentada que mede,
+# a cada fit / transform / predict:
+# - tempo de parede e linhas por segundo;
+# - pico de memória alocada DURANTE a chamada (tracemalloc, descontando o que já
+#   estava alocado antes; etapas aninhadas não apagam o pico da etapa de fora).
+# O embrulho é transparente: get_params/set_params/clone vão direto para a etapa
+# original, então GridSearchCV, 'classifier__C' etc. funcionam igual.
+#
+# Uso (opt-in, nos scripts com INSTRUMENTAR = True):
+#   pipeline = instrumentar(pipeline)
+#   pipeline.fit(X, y); pipeline.predict(X)
+#   salvar_registro('instrumentacao_churn.json')
+#   pipeline = desinstrumentar(pipeline)   # devolve os objetos originais já treinados
+#
+# Limitação: medições feitas dentro de workers (n_jobs > 1) ficam no processo do
+# worker; para medir a busca de hiperparâmetros por etapa, rode com n_jobs=1.
+
+REGISTRO = []          # Uma linha por chamada: consumido pelo salvar_registro
+_PILHA_MEMORIA = []    # Controle do pico de memória em chamadas aninhadas
+
+
+def _entrar():
+    atual, pico = tracemalloc.get_traced_memory()
+    if _PILHA_MEMORIA:
+        # Guarda o pico da etapa de fora antes de zerar o contador para a de dentro
+        _PILHA_MEMORIA[-1]['pico'] = max(_PILHA_MEMORIA[-1]['pico'], pico)
+    tracemalloc.reset_peak()
+    _PILHA_MEMORIA.append({'inicio': atual, 'pico': atual})
+
+
+def _sair():
+    _, pico = tracemalloc.get_traced_memory()
+    quadro = _PILHA_MEMORIA.pop()
+    pico_absoluto = max(quadro['pico'], pico)
+    if _PILHA_MEMORIA:
+        _PILHA_MEMORIA[-1]['pico'] = max(_PILHA_MEMORIA[-1]['pico'], pico_absoluto)
+    tracemalloc.reset_peak()
+    return pico_absoluto - quadro['inicio']
+
+
+def _tem_metodo(nome_metodo):
+    # O embrulho só expõe predict_proba, transform etc. se a etapa original tiver
+    return lambda self: hasattr(self.etapa, nome_metodo)
+
+
+class EtapaInstrumentada(BaseEstimator):
+
+    def __init__(self, etapa, nome):
+        self.etapa = etapa
+        self.nome = nome
+
+    # --- Transparência: parâmetros, clone, tags e atributos são os da etapa original ---
+    def get_params(self, deep=True):
+        return self.etapa.get_params(deep=deep)
+
+    def set_params(self, **params):
+        self.etapa.set_params(**params)
+        return self
+
+    def __sklearn_clone__(self):
+        return EtapaInstrumentada(clone(self.etapa), self.nome)
+
+    def __sklearn_tags__(self):
+        return self.etapa.__sklearn_tags__()
+
+    def __sklearn_is_fitted__(self):
+        try:
+            check_is_fitted(self.etapa)
+            return True
+        except NotFittedError:
+            return False
+
+    def __getattr__(self, atributo):
+        # Só é chamado quando o atributo não existe no embrulho (classes_, named_steps, mean_...)
+        if atributo == 'etapa':
+            raise AttributeError(atributo)
+        return getattr(self.etapa, atributo)
+
+    def __repr__(self, N_CHAR_MAX=700):
+        return f"EtapaInstrumentada({self.etapa!r})"
+
+    # --- Medição ---
+    def _medir(self, metodo, X, *args, **kwargs):
+        rastreando = tracemalloc.is_tracing()
+        if not rastreando:
+            tracemalloc.start()
+        _entrar()
+        inicio = time.perf_counter()
+        try:
+            resultado = getattr(self.etapa, metodo)(X, *args, **kwargs)
+        finally:
+            tempo = time.perf_counter() - inicio
+            memoria = _sair()
+            if not rastreando:
+                tracemalloc.stop()
+
+        linhas = len(X) if hasattr(X, '__len__') else X.shape[0]
+        REGISTRO.append({
+            'etapa': self.nome,
+            'classe': type(self.etapa).__name__,
+            'metodo': metodo,
+            'linhas': int(linhas),
+            'tempo_s': tempo,
+            'linhas_por_s': linhas / tempo if tempo > 0 else None,
+            'pico_memoria_mb': memoria / 1024 ** 2,
+            'pid': os.getpid(),
+            'momento': datetime.now().isoformat(timespec='milliseconds'),
+        })
+        return resultado
+
+    def fit(self, X, y=None, **kwargs):
+        self._medir('fit', X, y, **kwargs)
+        return self
+
+    @available_if(_tem_metodo('fit_transform'))
+    def fit_transform(self, X, y=None, **kwargs):
+        return self._medir('fit_transform', X, y, **kwargs)
+
+    @available_if(_tem_metodo('transform'))
+    def transform(self, X, **kwargs):
+        return self._medir('transform', X, **kwargs)
+
+    @available_if(_tem_metodo('fit_predict'))
+    def fit_predict(self, X, y=None, **kwargs):
+        return self._medir('fit_predict', X, y, **kwargs)
+
+    @available_if(_tem_metodo('predict'))
+    def predict(self, X, **kwargs):
+        return self._medir('predict', X, **kwargs)
+
+    @available_if(_tem_metodo('predict_proba'))
+    def predict_proba(self, X, **kwargs):
+        return self._medir('predict_proba', X, **kwargs)
+
+    @available_if(_tem_metodo('decision_function'))
+    def decision_function(self, X, **kwargs):
+        return self._medir('decision_function', X, **kwargs)
+
+    @available_if(_tem_metodo('score'))
+    def score(self, X, y=None, **kwargs):
+        return self._medir('score', X, y, **kwargs)
+
+
+def instrumentar(estimador, nome='pipeline'):
+    # Embrulha o objeto e, recursivamente, cada etapa de Pipeline e cada
+    # transformador de ColumnTransformer. Nomes no formato 'pipeline/preprocessor/num/scaler'.
+    if isinstance(estimador, EtapaInstrumentada) or estimador in ('drop', 'passthrough'):
+        return estimador
+    if isinstance(estimador, Pipeline):
+        estimador.steps = [(n, instrumentar(etapa, f'{nome}/{n}')) for n, etapa in estimador.steps]
+    elif isinstance(estimador, ColumnTransformer):
+        estimador.transformers = [(n, instrumentar(t, f'{nome}/{n}'), colunas)
+                                  for n, t, colunas in estimador.transformers]
+    return EtapaInstrumentada(estimador, nome)
+
+
+def desinstrumentar(estimador):
+    # Caminho inverso: devolve os objetos originais (treinados, se já houve fit).
+    # Use antes de salvar o modelo ou de passá-lo para código que inspeciona as etapas.
+    if isinstance(estimador, EtapaInstrumentada):
+        return desinstrumentar(estimador.etapa)
+    if isinstance(estimador, Pipeline):
+        estimador.steps = [(n, desinstrumentar(etapa)) for n, etapa in estimador.steps]
+    elif isinstance(estimador, ColumnTransformer):
+        estimador.transformers = [(n, desinstrumentar(t), c) for n, t, c in estimador.transformers]
+        if hasattr(estimador, 'transformers_'):
+            estimador.transformers_ = [(n, desinstrumentar(t), c) for n, t, c in estimador.transformers_]
+    return estimador
+
+
+def resumo_registro(registro=None):
+    # Agregado por etapa e método: onde está o gargalo
+    df = pd.DataFrame(REGISTRO if registro is None else registro)
+    if df.empty:
+        return df
+    return (df.groupby(['etapa', 'metodo'], sort=False)
+              .agg(chamadas=('tempo_s', 'size'), linhas=('linhas', 'sum'), tempo_total_s=('tempo_s', 'sum'),
+                   pico_memoria_mb=('pico_memoria_mb', 'max'))
+              .assign(linhas_por_s=lambda d: d['linhas'] / d['tempo_total_s'])
+              .reset_index())
+
+
+def salvar_registro(caminho, contexto=None, limpar=True):
+    # JSON estruturado para os dashboards: chamadas brutas + resumo por etapa
+    saida = {
+        'gerado_em': datetime.now().isoformat(timespec='seconds'),
+        'contexto': contexto or {},
+        'resumo': resumo_registro().to_dict(orient='records'),
+        'chamadas': list(REGISTRO),
+    }
+    with open(caminho, 'w') as arquivo:
+        json.dump(saida, arquivo, indent=2, ensure_ascii=False)
+    if limpar:
+        REGISTRO.clear()
+    return caminho
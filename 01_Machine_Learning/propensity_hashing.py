@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+from sklearn.pipeline import Pipeline
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.preprocessing import StandardScaler, OneHotEncoder, FunctionTransformer
+from sklearn.feature_extraction import FeatureHasher
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+
+from retail_pipelines import PROPENSAO_NUMERIC_FEATURES, PROPENSAO_CATEGORICAL_FEATURES, PROPENSAO_TARGET
+
+# ==============================================================================
+# #️⃣ PROPENSÃO COM FEATURES DE ALTA CARDINALIDADE (FEATURE HASHING)
+# ==============================================================================
+# O modelo de propensão só tem categorias minúsculas (dispositivo, flags). Em
+# produção entram origem da campanha (UTM), página de entrada e último SKU visto:
+# centenas de milhares de valores. Com OneHotEncoder, cada valor novo vira uma
+# coluna, e o encoder guarda a lista de todos eles; memória e tempo crescem com a
+# cardinalidade. Com FeatureHasher:
+# - Cada "coluna=valor" cai num de N_FEATURES_HASH baldes por hash (largura FIXA);
+# - Nada de vocabulário para aprender nem guardar: valor nunca visto também tem balde;
+# - A matriz fica esparsa do começo ao fim (sparse_threshold=1.0 no ColumnTransformer);
+# - Do outro lado, um solver que trabalha direto em matriz esparsa (saga ou SGD).
+# O preço: colisões (dois valores no mesmo balde); o modelo perde pouco (veja o benchmark).
+
+ALTA_CARDINALIDADE_FEATURES = ['utm_source', 'landing_page', 'ultimo_sku_visto']
+N_FEATURES_HASH = 2 ** 18
+
+
+def gerar_leads_alta_cardinalidade(n, n_niveis=100_000, semente=42):
+    # Mesma receita do sales_propensity_model.py + três colunas de alta cardinalidade.
+    # Algumas origens/páginas/SKUs "convertem" mais: o modelo precisa enxergá-las.
+    rng = np.random.default_rng(semente)
+    utm = rng.zipf(1.3, n) % n_niveis             # Poucas origens concentram o tráfego (cauda longa)
+    pagina = rng.integers(0, n_niveis, n)
+    sku = rng.integers(0, n_niveis, n)
+
+    df = pd.DataFrame({
+        'visitas_site_ultimo_mes': rng.integers(0, 30, n),
+        'tempo_medio_pagina_seg': rng.integers(10, 600, n),
+        'adicionou_carrinho_abandonou': (rng.random(n) < 0.3).astype(np.int64),
+        'dispositivo': np.array(['Mobile', 'Desktop', 'Tablet'], dtype=object)[rng.integers(0, 3, n)],
+        'comprou_colecao_anterior': (rng.random(n) < 0.2).astype(np.int64),
+        'utm_source': pd.Series(utm).map('utm_{}'.format).to_numpy(dtype=object),
+        'landing_page': pd.Series(pagina).map('/lp/{}'.format).to_numpy(dtype=object),
+        'ultimo_sku_visto': pd.Series(sku).map('SKU{:06d}'.format).to_numpy(dtype=object),
+    })
+
+    score_compra = (
+        df['visitas_site_ultimo_mes'] * 0.5
+        + df['tempo_medio_pagina_seg'] / 60
+        + df['comprou_colecao_anterior'] * 10
+        + df['adicionou_carrinho_abandonou'] * 5
+        + (utm % 7 == 0) * 8                      # Origens "boas"
+        + (pagina % 11 == 0) * 6                  # Páginas que convertem
+    )
+    probabilidade = 1 / (1 + np.exp(-(score_compra - score_compra.mean()) / 5))
+    df[PROPENSAO_TARGET] = rng.binomial(1, probabilidade)
+    return df
+
+
+def _tokens_coluna_valor(X):
+    # DataFrame (n x colunas) -> uma lista de "coluna=valor" por linha, para o FeatureHasher.
+    # A coluna entra no token: 'utm_source=123' e 'landing_page=123' não colidem de propósito.
+    tokens = [(coluna + '=' + X[coluna].astype(str)).to_numpy() for coluna in X.columns]
+    return np.column_stack(tokens)
+
+
+def construir_preprocessor_hashing(colunas_hash=ALTA_CARDINALIDADE_FEATURES, n_features=N_FEATURES_HASH):
+    numeric_transformer = Pipeline(steps=[
+        ('imputer', SimpleImputer(strategy='median')),
+        ('scaler', StandardScaler())
+    ])
+    categorical_transformer = Pipeline(steps=[
+        ('imputer', SimpleImputer(strategy='constant', fill_value='missing')),
+        ('onehot', OneHotEncoder(handle_unknown='ignore'))
+    ])
+    hashing_transformer = Pipeline(steps=[
+        ('tokens', FunctionTransformer(_tokens_coluna_valor)),
+        ('hasher', FeatureHasher(n_features=n_features, input_type='string', alternate_sign=False))
+    ])
+    return ColumnTransformer(
+        transformers=[
+            ('num', numeric_transformer, PROPENSAO_NUMERIC_FEATURES),
+            ('cat', categorical_transformer, PROPENSAO_CATEGORICAL_FEATURES),
+            ('hash', hashing_transformer, list(colunas_hash))
+        ],
+        sparse_threshold=1.0)   # Nunca densifica: a saída é sempre CSR
+
+
+def construir_preprocessor_onehot(colunas_alta_cardinalidade=ALTA_CARDINALIDADE_FEATURES):
+    # Caminho "atual" (para comparação): as colunas novas entram no mesmo OneHotEncoder
+    numeric_transformer = Pipeline(steps=[
+        ('imputer', SimpleImputer(strategy='median')),
+        ('scaler', StandardScaler())
+    ])
+    categorical_transformer = Pipeline(steps=[
+        ('imputer', SimpleImputer(strategy='constant', fill_value='missing')),
+        ('onehot', OneHotEncoder(handle_unknown='ignore'))
+    ])
+    return ColumnTransformer(
+        transformers=[
+            ('num', numeric_transformer, PROPENSAO_NUMERIC_FEATURES),
+            ('cat', categorical_transformer, PROPENSAO_CATEGORICAL_FEATURES + list(colunas_alta_cardinalidade))
+        ],
+        sparse_threshold=1.0)
+
+
+def construir_modelo_esparso(preprocessor, solver='saga'):
+    # 'saga': LogisticRegression que aceita CSR direto | 'sgd': uma passada por época, memória mínima
+    if solver == 'sgd':
+        classifier = SGDClassifier(loss='log_loss', alpha=1e-5, max_iter=20, tol=1e-3, random_state=42)
+    else:
+        classifier = LogisticRegression(solver='saga', C=1.0, max_iter=200, tol=1e-3)
+    return Pipeline(steps=[('preprocessor', preprocessor), ('classifier', classifier)])
+
+
+if __name__ == "__main__":
+    # Benchmark: OneHot x Hashing com cardinalidade crescente (mesmo nº de linhas)
+    import time
+    import pickle
+    import tracemalloc
+    import warnings
+    warnings.filterwarnings('ignore')
+    from sklearn.model_selection import train_test_split
+    from sklearn.metrics import roc_auc_score
+
+    n_linhas = 200_000
+    print(f"{'CAMINHO':<8} | {'NÍVEIS':>8} | {'COLUNAS':>9} | {'FIT':>7} | {'PICO MEM':>9} | {'MODELO':>9} | ROC-AUC")
+    print("-" * 80)
+    for n_niveis in [1_000, 10_000, 100_000, 1_000_000]:
+        df = gerar_leads_alta_cardinalidade(n_linhas, n_niveis)
+        X = df.drop(columns=PROPENSAO_TARGET)
+        y = df[PROPENSAO_TARGET]
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+        for nome, preprocessor in [('onehot', construir_preprocessor_onehot()),
+                                   ('hashing', construir_preprocessor_hashing())]:
+            modelo = construir_modelo_esparso(preprocessor, solver='sgd')
+            tracemalloc.start()
+            inicio = time.perf_counter()
+            modelo.fit(X_train, y_train)
+            tempo_fit = time.perf_counter() - inicio
+            _, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            auc = roc_auc_score(y_test, modelo.predict_proba(X_test)[:, 1])
+            n_colunas = modelo.named_steps['classifier'].coef_.shape[1]
+            tamanho = len(pickle.dumps(modelo)) / 1024 ** 2
+            print(f"{nome:<8} | {n_niveis:>8,} | {n_colunas:>9,} | {tempo_fit:6.2f}s | {pico / 1024 ** 2:6.0f} MB | "
+                  f"{tamanho:6.1f} MB | {auc:.4f}")
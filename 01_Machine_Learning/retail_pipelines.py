@@ -0,0 +1,74 @@
+from sklearn.pipeline import Pipeline
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.preprocessing import StandardScaler, OneHotEncoder
+
+# ==============================================================================
+# 🧱 PRÉ-PROCESSADORES REUTILIZÁVEIS (MESMA RECEITA DOS SCRIPTS)
+# ==============================================================================
+# Fonte ÚNICA das receitas de pré-processamento: os scripts (churn, demanda,
+# propensão) e os módulos de produção (treino em chunks, benchmarks, etc.)
+# importam daqui. Mudou a receita? Muda só aqui.
+
+# --- CHURN (churn_prediction_xgboost.py) ---
+CHURN_NUMERIC_FEATURES = ['idade', 'tempo_como_cliente_meses', 'total_gasto_ultimo_ano', 'frequencia_compras_ano']
+CHURN_CATEGORICAL_FEATURES = ['categoria_favorita', 'usou_sac_recente']
+CHURN_TARGET = 'churn'
+
+# --- DEMANDA (demand_forecasting_regressao.py) ---
+DEMANDA_NUMERIC_FEATURES = ['investimento_marketing', 'preco_produto', 'temperatura_media']
+DEMANDA_CATEGORICAL_FEATURES = ['dia_semana']
+DEMANDA_TARGET = 'unidades_vendidas'
+
+# --- PROPENSÃO (sales_propensity_model.py) ---
+PROPENSAO_NUMERIC_FEATURES = ['visitas_site_ultimo_mes', 'tempo_medio_pagina_seg']
+PROPENSAO_CATEGORICAL_FEATURES = ['dispositivo', 'adicionou_carrinho_abandonou', 'comprou_colecao_anterior']
+PROPENSAO_TARGET = 'comprou'
+
+
+def construir_preprocessor_churn():
+    # Numéricas: nulo -> mediana, depois escala | Categóricas: nulo -> 'missing', depois OneHot
+    numeric_transformer = Pipeline(steps=[
+        ('imputer', SimpleImputer(strategy='median')),
+        ('scaler', StandardScaler())
+    ])
+    categorical_transformer = Pipeline(steps=[
+        ('imputer', SimpleImputer(strategy='constant', fill_value='missing')),
+        ('onehot', OneHotEncoder(handle_unknown='ignore'))
+    ])
+    return ColumnTransformer(
+        transformers=[
+            ('num', numeric_transformer, CHURN_NUMERIC_FEATURES),
+            ('cat', categorical_transformer, CHURN_CATEGORICAL_FEATURES)
+        ])
+
+
+def construir_preprocessor_demanda():
+    # Base sem nulos: só escala (essencial para Redes Neurais e SVR) e OneHot
+    numeric_transformer = Pipeline(steps=[
+        ('scaler', StandardScaler())
+    ])
+    categorical_transformer = Pipeline(steps=[
+        ('onehot', OneHotEncoder(handle_unknown='ignore'))
+    ])
+    return ColumnTransformer(
+        transformers=[
+            ('num', numeric_transformer, DEMANDA_NUMERIC_FEATURES),
+            ('cat', categorical_transformer, DEMANDA_CATEGORICAL_FEATURES)
+        ])
+
+
+def construir_preprocessor_propensao():
+    numeric_transformer = Pipeline(steps=[
+        ('imputer', SimpleImputer(strategy='median')),
+        ('scaler', StandardScaler())
+    ])
+    categorical_transformer = Pipeline(steps=[
+        ('imputer', SimpleImputer(strategy='constant', fill_value='missing')),
+        ('onehot', OneHotEncoder(handle_unknown='ignore'))
+    ])
+    return ColumnTransformer(
+        transformers=[
+            ('num', numeric_transformer, PROPENSAO_NUMERIC_FEATURES),
+            ('cat', categorical_transformer, PROPENSAO_CATEGORICAL_FEATURES)
+        ])
@@ -0,0 +1,111 @@
+import os
+import numpy as np
+import pandas as pd
+
+# ==============================================================================
+# 🧮 MOTOR RFM INCREMENTAL (STREAMING DE TRANSAÇÕES)
+# ==============================================================================
+# O script original calcula a Recência com um lambda por cliente dentro do
+# groupby().agg (Python puro, grupo a grupo) e precisa de TODAS as vendas na RAM.
+# Aqui:
+# - As datas viram int64 (nanossegundos) e a agregação é só max/count/sum,
+#   reduções vetorizadas do pandas;
+# - As transações podem chegar em partições (um arquivo por dia, por exemplo);
+# - O ESTADO por cliente (última compra, nº de compras, total gasto) fica salvo
+#   e é atualizado só com as vendas novas do dia, sem reprocessar o histórico.
+
+NS_POR_DIA = 86_400 * 10**9
+COLUNAS_ESTADO = ['ultima_compra', 'frequencia', 'monetario']
+PARTICOES_POR_RODADA = 16    # Parciais acumulados antes de recolher num estado só
+
+
+def agregar_transacoes(df_transacoes):
+    # Uma passada vetorizada: max da data (int64), contagem e soma por cliente
+    datas_ns = df_transacoes['data_compra'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+    agregado = pd.DataFrame({
+        'id_cliente': df_transacoes['id_cliente'].to_numpy(),
+        'ultima_compra': datas_ns,
+        'valor': df_transacoes['valor'].to_numpy(dtype=np.float64),
+    }).groupby('id_cliente').agg(
+        ultima_compra=('ultima_compra', 'max'),
+        frequencia=('valor', 'size'),
+        monetario=('valor', 'sum'),
+    )
+    agregado['frequencia'] = agregado['frequencia'].astype(np.int64)
+    return agregado
+
+
+def estado_vazio():
+    return pd.DataFrame({
+        'ultima_compra': pd.Series(dtype=np.int64),
+        'frequencia': pd.Series(dtype=np.int64),
+        'monetario': pd.Series(dtype=np.float64),
+    }, index=pd.Index([], name='id_cliente', dtype=np.int64))
+
+
+def _combinar(parciais):
+    # Estados parciais (estado salvo + agregados de partições) -> um estado só.
+    # Um concat + groupby por rodada: custo proporcional ao que entra, não ao nº de partições já lidas
+    parciais = [p for p in parciais if len(p)]
+    if not parciais:
+        return estado_vazio()
+    return (pd.concat(parciais)[COLUNAS_ESTADO]
+              .groupby(level=0)
+              .agg({'ultima_compra': 'max', 'frequencia': 'sum', 'monetario': 'sum'})
+              .rename_axis('id_cliente'))
+
+
+def atualizar_estado(estado, df_novas_transacoes):
+    # Devolve um estado NOVO: o DataFrame de quem chamou (ex: o carregado do disco) fica intacto
+    return _combinar([estado, agregar_transacoes(df_novas_transacoes)])
+
+
+def rfm_em_streaming(particoes, estado=None, recolher_a_cada=PARTICOES_POR_RODADA):
+    # particoes: qualquer iterável de DataFrames de transações (ex: um Parquet por dia).
+    # Cada partição é agregada sozinha; os parciais são somados num groupby a cada
+    # 'recolher_a_cada' partições (memória limitada) e no fim. O 'estado' recebido não é alterado.
+    parciais = [] if estado is None else [estado]
+    for particao in particoes:
+        parciais.append(agregar_transacoes(particao))
+        if len(parciais) > recolher_a_cada:
+            parciais = [_combinar(parciais)]
+    return _combinar(parciais)
+
+
+def calcular_rfm(estado, data_referencia=None):
+    # data_referencia: padrão = última compra da base (igual ao script original)
+    if data_referencia is None:
+        referencia_ns = int(estado['ultima_compra'].max())
+    else:
+        referencia_ns = pd.Timestamp(data_referencia).value
+    return pd.DataFrame({
+        'Recencia': (referencia_ns - estado['ultima_compra']) // NS_POR_DIA,
+        'Frequencia': estado['frequencia'],
+        'Monetario': estado['monetario'],
+    }).sort_index()
+
+
+# ==============================================================================
+# 💾 PERSISTÊNCIA DO ESTADO (A "MEMÓRIA" ENTRE UM DIA E OUTRO)
+# ==============================================================================
+def salvar_estado(estado, caminho):
+    estado.to_parquet(caminho)
+
+
+def carregar_estado(caminho):
+    return pd.read_parquet(caminho) if os.path.exists(caminho) else estado_vazio()
+
+
+if __name__ == "__main__":
+    # Demonstração: 30 "dias" de vendas chegando um por vez, estado salvo entre as rodadas
+    from synthetic_data_factory import gerar_chunk
+
+    caminho_estado = 'estado_rfm.parquet'
+    estado = carregar_estado(caminho_estado)
+    for dia in range(30):
+        vendas_do_dia = gerar_chunk('transacoes', dia, 30 * 100_000, tamanho_chunk=100_000, n_clientes=200_000)
+        estado = atualizar_estado(estado, vendas_do_dia)
+    salvar_estado(estado, caminho_estado)
+
+    print(f"✅ Estado RFM atualizado: {len(estado):,} clientes")
+    print(calcular_rfm(estado).head())
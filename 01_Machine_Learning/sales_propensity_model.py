@@ -1,49 +1,34 @@
-import pandas as pd
-import numpy as np
 import warnings
-from sklearn.model_selection import train_test_split, GridSearchCV
-from sklearn.pipeline import Pipeline
-from sklearn.compose import ColumnTransformer
-from sklearn.impute import SimpleImputer
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
+from sklearn.model_selection import train_test_split, StratifiedKFold
+from sklearn.base import clone
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import roc_auc_score, accuracy_score, precision_score, recall_score
 
+from retail_pipelines import construir_preprocessor_propensao
+from synthetic_data_factory import gerar_em_memoria
+from model_search import construir_cache_folds, avaliar_modelos_em_pool, melhores_por_modelo, montar_campeao
+from campaign_selection import pontuar_em_chunks, selecionar_leads
+from campaign_roi_simulator import simular_roi
+from pipeline_instrumentation import instrumentar, salvar_registro
+
 # Ignorar avisos chatos do sklearn para limpar a tela
 warnings.filterwarnings('ignore')
 
+# Opt-in: True = mede tempo/memória de cada etapa do Pipeline e grava um JSON (pipeline_instrumentation.py)
+INSTRUMENTAR = False
+
 # ==============================================================================
 # 1. GERAÇÃO DE DADOS (COM PADRÕES VICIADOS PARA A IA APRENDER)
 # ==============================================================================
-np.random.seed(42)
 n_samples = 5000
 
 print("🎲 Gerando dados simulados de navegação e compras...")
 
-data = {
-    'id_cliente': range(1, n_samples + 1),
-    'visitas_site_ultimo_mes': np.random.randint(0, 30, n_samples),
-    'tempo_medio_pagina_seg': np.random.randint(10, 600, n_samples), # Segundos
-    'adicionou_carrinho_abandonou': np.random.choice([0, 1], n_samples, p=[0.7, 0.3]),
-    'dispositivo': np.random.choice(['Mobile', 'Desktop', 'Tablet'], n_samples),
-    'comprou_colecao_anterior': np.random.choice([0, 1], n_samples, p=[0.8, 0.2]),
-}
-
-df = pd.DataFrame(data)
-
-# --- CRIANDO A LÓGICA DO ALVO (TARGET) ---
+# --- LÓGICA DO ALVO (TARGET), aplicada pela fábrica (synthetic_data_factory.py) ---
 # Quem compra (1) geralmente tem este comportamento:
 # Visita muito, fica muito tempo E já comprou antes.
-score_compra = (
-    (df['visitas_site_ultimo_mes'] * 0.5) + 
-    (df['tempo_medio_pagina_seg'] / 60) + 
-    (df['comprou_colecao_anterior'] * 10) +
-    (df['adicionou_carrinho_abandonou'] * 5)
-)
-# Normalizando para probabilidade (Sigmoid fake)
-probabilidade = 1 / (1 + np.exp(-(score_compra - score_compra.mean()) / 5))
-df['comprou'] = np.random.binomial(1, probabilidade)
+df = gerar_em_memoria('propensao', n_samples)
 
 print(f"📊 Base pronta: {len(df)} clientes. Taxa de Conversão Real: {df['comprou'].mean():.1%}")
 
@@ -54,25 +39,9 @@ X = df.drop(['id_cliente', 'comprou'], axis=1)
 y = df['comprou']
 X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
-# Tratamento Numérico
-numeric_features = ['visitas_site_ultimo_mes', 'tempo_medio_pagina_seg']
-numeric_transformer = Pipeline(steps=[
-    ('imputer', SimpleImputer(strategy='median')),
-    ('scaler', StandardScaler())
-])
-
-# Tratamento Categórico
-categorical_features = ['dispositivo', 'adicionou_carrinho_abandonou', 'comprou_colecao_anterior']
-categorical_transformer = Pipeline(steps=[
-    ('imputer', SimpleImputer(strategy='constant', fill_value='missing')),
-    ('onehot', OneHotEncoder(handle_unknown='ignore'))
-])
-
-preprocessor = ColumnTransformer(
-    transformers=[
-        ('num', numeric_transformer, numeric_features),
-        ('cat', categorical_transformer, categorical_features)
-    ])
+# Numéricas: mediana + escala | Categóricas: 'missing' + OneHot.
+# A receita mora no retail_pipelines.py (a mesma do modelo com hashing e dos benchmarks).
+preprocessor = construir_preprocessor_propensao()
 
 # ==============================================================================
 # 3. BATALHA DE MODELOS (GRID SEARCH)
@@ -112,25 +81,36 @@ melhor_nome_global = ""
 print("\n🥊 INICIANDO A BATALHA DE MODELOS (GRID SEARCH)...")
 print("-" * 60)
 
+# Todas as tarefas (modelo x parâmetros x fold) vão para UM pool só, com 1 thread
+# de OpenMP/BLAS por worker (sem paralelismo aninhado). Os folds são os mesmos do
+# GridSearchCV(cv=3) para classificação: StratifiedKFold(3) sem embaralhar, e o
+# pré-processador é ajustado uma vez por fold.
+if INSTRUMENTAR:
+    # Os fits dos candidatos rodam nos workers (não entram no registro); o pré-processamento
+    # dos folds, o refit do vencedor e as previsões, sim.
+    preprocessor = instrumentar(preprocessor, 'preprocessor')
+cache_folds = construir_cache_folds(preprocessor, X_train, y_train, cv=StratifiedKFold(n_splits=3))
+tabela_grid = avaliar_modelos_em_pool(modelos_para_testar, cache_folds, 'roc_auc', nome_etapa='classifier')
+campeoes = melhores_por_modelo(tabela_grid).set_index('modelo')
+
 for modelo_info in modelos_para_testar:
     print(f"Testando: {modelo_info['nome']}...")
+    melhor = campeoes.loc[modelo_info['nome']]
     
-    # Cria o Pipeline completo para este modelo
-    pipeline = Pipeline(steps=[('preprocessor', preprocessor),
-                               ('classifier', modelo_info['estimator'])])
-    
-    # O GridSearch vai testar TODAS as combinações de parâmetros acima
-    grid = GridSearchCV(pipeline, modelo_info['params'], cv=3, scoring='roc_auc', n_jobs=-1)
-    grid.fit(X_train, y_train)
-    
-    print(f"   ✅ Melhor ROC-AUC Interno: {grid.best_score_:.4f}")
-    print(f"   ⚙️ Melhores Parâmetros: {grid.best_params_}")
+    print(f"   ✅ Melhor ROC-AUC Interno: {melhor['score_medio']:.4f}")
+    print(f"   ⚙️ Melhores Parâmetros: {melhor['params']}")
     
     # Verifica se este é o novo campeão
-    if grid.best_score_ > melhor_score_global:
-        melhor_score_global = grid.best_score_
-        melhor_modelo_global = grid.best_estimator_ # Guarda o modelo treinado
+    if melhor['score_medio'] > melhor_score_global:
+        melhor_score_global = melhor['score_medio']
         melhor_nome_global = modelo_info['nome']
+        estimator_vencedor = modelo_info['estimator'] # Só o campeão final é retreinado (abaixo)
+
+# Refit do vencedor na base de treino inteira -> Pipeline(preprocessor + classifier)
+if INSTRUMENTAR:
+    estimator_vencedor = instrumentar(clone(estimator_vencedor), 'pipeline/classifier')
+melhor_modelo_global = montar_campeao(estimator_vencedor, campeoes.loc[melhor_nome_global, 'params'],
+                                      cache_folds, nome_etapa='classifier')
 
 print("-" * 60)
 print(f"🏆 O VENCEDOR FOI: {melhor_nome_global.upper()}")
@@ -141,6 +121,8 @@ print("-" * 60)
 # 4. AVALIAÇÃO FINAL E IMPACTO FINANCEIRO
 # ==============================================================================
 # Usamos o MELHOR modelo para fazer as previsões finais
+if INSTRUMENTAR:
+    melhor_modelo_global = instrumentar(melhor_modelo_global)
 y_pred = melhor_modelo_global.predict(X_test)
 y_proba = melhor_modelo_global.predict_proba(X_test)[:, 1]
 
@@ -195,4 +177,53 @@ print(f"CENÁRIO 2 (Marketing de Luxo R$ 50,00):")
 print(f"   - Lucro Massivo: R$ {lucro_massivo_caro:,.2f} (Prejuízo ou lucro baixo)")
 print(f"   - Lucro IA:      R$ {lucro_ia_caro:,.2f} (Eficiência Máxima)")
 print(f"\n🚀 DIFERENÇA (O QUE A IA SALVOU): R$ {lucro_ia_caro - lucro_massivo_caro:,.2f}")
-print("="*40)
\ No newline at end of file
+print("="*40)
+
+# ==============================================================================
+# 6. CAMPANHA COM VERBA FECHADA (QUEM RECEBE O CATÁLOGO?)
+# ==============================================================================
+# Na vida real a verba é fixa: com R$ 10.000 e catálogo a R$ 50 saem 200 catálogos.
+# Em vez do corte > 50%, escolhemos os leads de MAIOR lucro esperado
+# (prob * lucro_venda - custo), lendo a base pontuada em chunks.
+orcamento_campanha = 10_000.00
+
+df_leads = X_test.assign(id_cliente=df.loc[X_test.index, 'id_cliente'])
+selecionados, resumo = selecionar_leads(
+    pontuar_em_chunks(melhor_modelo_global, df_leads, tamanho_chunk=250),
+    orcamento=orcamento_campanha, custo_contato=custo_catalogo, lucro_venda=lucro_venda)
+
+# Conferindo com o que aconteceu de verdade no teste
+compradores = y_test.set_axis(df_leads['id_cliente'])
+receita_real = compradores.loc[selecionados['id_cliente']].sum() * lucro_venda
+lucro_real = receita_real - resumo['custo_total']
+
+print(f"\n🎯 CAMPANHA COM VERBA DE R$ {orcamento_campanha:,.2f} (Catálogo R$ {custo_catalogo:,.2f}):")
+print(f"   - Leads escolhidos: {resumo['leads_selecionados']} de {resumo['leads_avaliados']} "
+      f"(limite da verba: {resumo['limite_orcamento']})")
+print(f"   - Lucro Esperado: R$ {resumo['lucro_esperado']:,.2f} (ROI esperado {resumo['roi_esperado']:.0%})")
+print(f"   - Lucro Real:     R$ {lucro_real:,.2f} (ROI real {lucro_real / resumo['custo_total']:.0%})")
+print(f"   - Corte > 50% (sem limite de verba): R$ {lucro_ia_caro:,.2f} "
+      f"(ROI {lucro_ia_caro / custo_ia_caro:.0%}, gastando R$ {custo_ia_caro:,.2f})")
+print("="*40)
+
+# ==============================================================================
+# 7. E SE O TESTE TIVESSE OUTROS CLIENTES? (MONTE CARLO DO ROI)
+# ==============================================================================
+# Os cenários 1 e 2 são UMA amostra. Reamostrando o teste 5.000 vezes sai o
+# intervalo de confiança do lucro e a chance real de a IA ganhar do Massivo,
+# para uma grade inteira de custo x margem x corte.
+cenarios = simular_roi(y_test, y_proba, custos_contato=[custo_sms, 20.00, custo_catalogo],
+                       lucros_venda=[100.00, lucro_venda, 200.00], limiares=[0.3, 0.5, 0.7])
+
+print("\n🎲 MONTE CARLO (IC 95%, margem R$ 150,00):")
+print(f"{'CORTE':<6} | {'CUSTO':<8} | {'LUCRO MASSIVO':<24} | {'LUCRO IA':<24} | {'IA VENCE'}")
+print("-" * 81)
+for _, c in cenarios[cenarios['lucro_venda'] == lucro_venda].iterrows():
+    print(f"{c['limiar']:<6.1f} | R$ {c['custo_contato']:<5.0f} | "
+          f"R$ {c['lucro_massivo_ic_inf']:>9,.0f} a {c['lucro_massivo_ic_sup']:>9,.0f} | "
+          f"R$ {c['lucro_ia_ic_inf']:>9,.0f} a {c['lucro_ia_ic_sup']:>9,.0f} | {c['prob_ia_vence']:.0%}")
+print("="*40)
+
+if INSTRUMENTAR:
+    caminho_json = salvar_registro('instrumentacao_propensao.json', {'script': 'propensao', 'linhas_treino': len(X_train)})
+    print(f"🩺 Tempo por etapa salvo em {caminho_json}")
@@ -0,0 +1,58 @@
+import numpy as np
+
+# ==============================================================================
+# 🎯 SEGMENTO EM TEMPO REAL PARA CLIENTE NOVO (SEM RODAR O KMEANS DE NOVO)
+# ==============================================================================
+# Hoje um cliente novo só ganha segmento quando o fit_predict roda de novo na
+# base toda. Mas para CLASSIFICAR basta o que o modelo aprendeu: média/desvio do
+# scaler + os centróides. Salvamos isso num arquivo minúsculo (.npz) e a
+# atribuição vira álgebra: distância² = ||c||² - 2·z·c (+ ||z||², igual para todos
+# os centróides, então nem precisa calcular). Um lote inteiro = UMA multiplicação
+# de matrizes em float32 (BLAS).
+
+COLUNAS_RFM = ['Recencia', 'Frequencia', 'Monetario']
+TAMANHO_BLOCO = 1_000_000   # Limita a matriz de distâncias temporária em lotes gigantes
+
+
+def salvar_modelo_segmentos(scaler, modelo, perfis, caminho='modelo_segmentos.npz'):
+    # perfis: {cluster: "💎 CAMPEÕES (VIPs)", ...} -> vem do nomear_cluster
+    k = modelo.cluster_centers_.shape[0]
+    np.savez(
+        caminho,
+        media=scaler.mean_.astype(np.float32),
+        escala=scaler.scale_.astype(np.float32),
+        centros=modelo.cluster_centers_.astype(np.float32),
+        perfis=np.array([perfis.get(c, '') for c in range(k)]),
+        colunas=np.array(COLUNAS_RFM),
+    )
+    return caminho
+
+
+def carregar_modelo_segmentos(caminho='modelo_segmentos.npz'):
+    arquivo = np.load(caminho)
+    centros = arquivo['centros']
+    return {
+        'media': arquivo['media'],
+        'escala': arquivo['escala'],
+        'centros_t': np.ascontiguousarray(centros.T),                    # (3 x k), pronto para o matmul
+        'norma_centros': np.einsum('ij,ij->i', centros, centros),        # ||c||² pré-calculado
+        'perfis': arquivo['perfis'],
+    }
+
+
+def atribuir_segmentos(modelo, X):
+    # X: array (n x 3) ou DataFrame com Recencia, Frequencia, Monetario (ordem do treino)
+    X = np.asarray(X[COLUNAS_RFM] if hasattr(X, 'columns') else X, dtype=np.float32)
+    clusters = np.empty(len(X), dtype=np.int32)
+    for inicio in range(0, len(X), TAMANHO_BLOCO):
+        Z = (X[inicio:inicio + TAMANHO_BLOCO] - modelo['media']) / modelo['escala']
+        distancias = modelo['norma_centros'] - 2.0 * (Z @ modelo['centros_t'])
+        clusters[inicio:inicio + TAMANHO_BLOCO] = np.argmin(distancias, axis=1)
+    return clusters, modelo['perfis'][clusters]
+
+
+def atribuir_cliente(modelo, recencia, frequencia, monetario):
+    # Caminho rápido para UM cliente (ex: acabou de passar no caixa)
+    z = (np.array([recencia, frequencia, monetario], dtype=np.float32) - modelo['media']) / modelo['escala']
+    cluster = int(np.argmin(modelo['norma_centros'] - 2.0 * (z @ modelo['centros_t'])))
+    return cluster, str(modelo['perfis'][cluster])
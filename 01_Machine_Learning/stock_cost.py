@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+
+# ==============================================================================
+# 📦 CUSTO ASSIMÉTRICO DE ESTOQUE (MILHÕES DE SKU-LOJA-DIA DE UMA VEZ)
+# ==============================================================================
+# Faltar produto (perder a venda) custa diferente de sobrar (estoque parado).
+# O calcular_prejuizo original percorre zip(reais, previstos) num loop Python
+# com custos globais. Aqui:
+# - Tudo é aritmética de arrays; custos podem ser um número ou um array por linha
+#   (custo do SKU daquela linha);
+# - A quebra por grupo (loja, categoria, loja x categoria...) sai de um np.bincount;
+# - O "quantil ótimo" de cada SKU: com custo de falta Cu e de sobra Co, a previsão
+#   que minimiza o prejuízo esperado é o quantil Cu / (Cu + Co) da demanda
+#   (problema do jornaleiro / newsvendor).
+
+
+def _codificar_grupos(grupos):
+    # Series -> factorize direto | DataFrame (várias colunas) -> um código inteiro por
+    # combinação (codigo_loja * n_categorias + codigo_categoria), sem tuplas Python.
+    # Chave nula vira um grupo próprio (NaN), como no groupby(dropna=False): nada de código -1
+    if not isinstance(grupos, pd.DataFrame):
+        return pd.factorize(pd.Series(grupos), sort=True, use_na_sentinel=False)
+
+    codigos = np.zeros(len(grupos), dtype=np.int64)
+    niveis = []
+    for coluna in grupos.columns:
+        codigos_coluna, valores = pd.factorize(grupos[coluna], sort=True, use_na_sentinel=False)
+        codigos = codigos * len(valores) + codigos_coluna
+        niveis.append(valores)
+    codigos, combinacoes = pd.factorize(codigos, sort=True)
+
+    # Decodifica só as combinações que existem de fato
+    indices = np.unravel_index(combinacoes, [len(v) for v in niveis])
+    nomes = pd.MultiIndex.from_arrays([v[i] for v, i in zip(niveis, indices)], names=list(grupos.columns))
+    return codigos, nomes
+
+
+def calcular_prejuizo_vetorizado(reais, previstos, custo_falta, custo_sobra, grupos=None):
+    reais = np.asarray(reais, dtype=np.float64)
+    erro = np.asarray(previstos, dtype=np.float64) - reais
+
+    # erro < 0: previ menos do que vendeu (faltou) | erro > 0: previ mais (sobrou)
+    perda = np.where(erro < 0, -erro * custo_falta, erro * custo_sobra)
+    total = float(perda.sum())
+    if grupos is None:
+        return total, None
+
+    codigos, nomes = _codificar_grupos(grupos)
+    por_grupo = np.bincount(codigos, weights=perda, minlength=len(nomes))
+    return total, pd.Series(por_grupo, index=nomes, name='prejuizo')
+
+
+def quantil_otimo(custo_falta, custo_sobra):
+    # Razão crítica: quanto mais caro faltar, mais alto o quantil a mirar
+    custo_falta = np.asarray(custo_falta, dtype=np.float64)
+    return custo_falta / (custo_falta + np.asarray(custo_sobra, dtype=np.float64))
+
+
+def previsao_otima_por_grupo(reais, grupos, custo_falta, custo_sobra):
+    # Para cada SKU (grupo): quantil empírico da demanda histórica na razão crítica.
+    # custo_falta/custo_sobra: número ou array por linha (o mesmo valor em todas as linhas do SKU).
+    reais = np.asarray(reais, dtype=np.float64)
+    codigos, nomes = _codificar_grupos(grupos)
+    q = np.broadcast_to(quantil_otimo(custo_falta, custo_sobra), reais.shape)
+
+    # Uma ordenação: por grupo e, dentro dele, pela demanda
+    ordem = np.lexsort((reais, codigos))
+    codigos_ord = codigos[ordem]
+    inicios = np.searchsorted(codigos_ord, np.arange(len(nomes)))
+    tamanhos = np.bincount(codigos, minlength=len(nomes))
+    q_grupo = q[ordem][inicios]
+
+    # Quantil pelo método "inferior" (posição inteira dentro do grupo)
+    posicao = inicios + np.floor(q_grupo * (tamanhos - 1)).astype(np.int64)
+    return pd.DataFrame({'quantil_otimo': q_grupo, 'previsao_otima': reais[ordem][posicao]}, index=nomes)
+
+
+if __name__ == "__main__":
+    # Benchmark: loop original x versão vetorizada (mesmo total?) em bases crescentes
+    import time
+
+    def calcular_prejuizo_loop(reais, previstos, custo_oportunidade=50.0, custo_estoque=20.0):
+        # Cópia fiel da função original do demand_forecasting_regressao.py
+        prejuizo = 0
+        for real, prev in zip(reais, previstos):
+            erro = prev - real
+            if erro < 0:
+                prejuizo += abs(erro) * custo_oportunidade
+            else:
+                prejuizo += erro * custo_estoque
+        return prejuizo
+
+    rng = np.random.default_rng(42)
+    for n in [100_000, 1_000_000, 5_000_000]:
+        reais = rng.poisson(20, n)
+        previstos = reais + rng.normal(0, 5, n)
+
+        inicio = time.perf_counter()
+        esperado = calcular_prejuizo_loop(reais, previstos)
+        tempo_loop = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        obtido, _ = calcular_prejuizo_vetorizado(reais, previstos, 50.0, 20.0)
+        tempo_vetor = time.perf_counter() - inicio
+        print(f"{n:>10,} linhas | loop: {tempo_loop:7.3f}s | vetorizado: {tempo_vetor:7.4f}s | "
+              f"{tempo_loop / tempo_vetor:5.0f}x | diferença relativa: {abs(obtido - esperado) / esperado:.1e}")
+
+    # Custos por SKU + quebra por loja x categoria + quantil ótimo de cada SKU
+    n, n_skus = 2_000_000, 5_000
+    sku = rng.integers(0, n_skus, n)
+    reais = rng.poisson(20, n)
+    previstos = reais + rng.normal(0, 5, n)
+    custo_falta = rng.uniform(20, 60, n_skus)[sku]
+    custo_sobra = rng.uniform(5, 30, n_skus)[sku]
+    grupos = pd.DataFrame({'loja': rng.integers(0, 50, n), 'categoria': sku % 10})
+
+    inicio = time.perf_counter()
+    total, por_grupo = calcular_prejuizo_vetorizado(reais, previstos, custo_falta, custo_sobra, grupos=grupos)
+    print(f"\nLoja x Categoria: {len(por_grupo)} grupos em {time.perf_counter() - inicio:.3f}s "
+          f"(total R$ {total:,.2f})")
+
+    inicio = time.perf_counter()
+    otimo = previsao_otima_por_grupo(reais, sku, custo_falta, custo_sobra)
+    print(f"Quantil ótimo de {len(otimo)} SKUs em {time.perf_counter() - inicio:.3f}s")
+    print(otimo.head())
@@ -0,0 +1,174 @@
+import os
+import math
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+# ==============================================================================
+# 🏭 FÁBRICA DE DADOS SINTÉTICOS (VOLUME DE PRODUÇÃO)
+# ==============================================================================
+# Fonte única dos dados dos 4 scripts de ML: eles pedem 2k-10k linhas na memória
+# (gerar_em_memoria) e o teste de carga pede de 10 milhões a 1 bilhão. Aqui:
+# - Tudo é vetorizado (nada de listas de Timestamp ou loops por linha);
+# - A base é gerada em CHUNKS, cada um com semente própria [SEMENTE, n_chunk]:
+#   o mesmo chunk sai idêntico em qualquer máquina/processo, em qualquer ordem;
+# - Cada chunk vira um arquivo Parquet (parte-00000.parquet, parte-00001...).
+# Cada gerador concentra as regras de negócio do dataset do script correspondente.
+
+SEMENTE = 42
+TAMANHO_CHUNK = 1_000_000
+DATA_REFERENCIA = np.datetime64('2026-01-31', 'D')
+
+_CATEGORIAS_CHURN = np.array(['Moda', 'Casa', 'Pet', 'Tech'], dtype=object)
+_DIAS_SEMANA = np.array(['Seg', 'Ter', 'Qua', 'Qui', 'Sex', 'Sab', 'Dom'], dtype=object)
+_DISPOSITIVOS = np.array(['Mobile', 'Desktop', 'Tablet'], dtype=object)
+
+
+# ==============================================================================
+# 1. GERADORES POR DATASET (UM CHUNK DE CADA VEZ)
+# ==============================================================================
+def gerar_chunk_churn(n, rng, id_inicial=1):
+    # Espelha churn_prediction_xgboost.py
+    df = pd.DataFrame({
+        'id_cliente': np.arange(id_inicial, id_inicial + n, dtype=np.int64),
+        'idade': rng.integers(18, 70, n).astype(np.float64),
+        'tempo_como_cliente_meses': rng.integers(1, 120, n),
+        'total_gasto_ultimo_ano': rng.exponential(1500, n),
+        'frequencia_compras_ano': rng.integers(1, 50, n),
+        'categoria_favorita': _CATEGORIAS_CHURN[rng.integers(0, len(_CATEGORIAS_CHURN), n)],
+        'usou_sac_recente': (rng.random(n) < 0.2).astype(np.int64),
+    })
+
+    # Usou SAC -> sai. Gasta pouco (< R$ 500) -> metade sai.
+    baixo_gasto = df['total_gasto_ultimo_ano'].to_numpy() < 500
+    churn = (df['usou_sac_recente'].to_numpy() == 1) | (baixo_gasto & (rng.random(n) < 0.5))
+    df['churn'] = churn.astype(np.int64)
+
+    # A mesma "sujeira" do original: 5% de idade nula e 2% de categoria nula
+    df.loc[rng.random(n) < 0.05, 'idade'] = np.nan
+    df.loc[rng.random(n) < 0.02, 'categoria_favorita'] = np.nan
+    return df
+
+
+def gerar_chunk_transacoes(n, rng, n_clientes=None, data_final=DATA_REFERENCIA):
+    # Espelha customer_segmentation_kmeans.py: datas como inteiros (dias) e não Timestamps.
+    # Transação não tem id de linha: o id_cliente é sorteado no universo 1..n_clientes.
+    # Chamada direta (n = base inteira): padrão de ~10 compras por cliente.
+    n_clientes = n_clientes or max(1, n // 10)
+    dias_atras = rng.integers(0, 365, n)
+    return pd.DataFrame({
+        'id_cliente': rng.integers(1, n_clientes + 1, n),
+        'data_compra': (data_final - dias_atras).astype('datetime64[ns]'),
+        'valor': rng.exponential(scale=200, size=n) + 20,
+    })
+
+
+def gerar_chunk_demanda(n, rng, id_inicial=1):
+    # Espelha demand_forecasting_regressao.py
+    df = pd.DataFrame({
+        'investimento_marketing': rng.uniform(500, 5000, n),
+        'preco_produto': rng.uniform(50, 200, n),
+        'dia_semana': _DIAS_SEMANA[rng.integers(0, len(_DIAS_SEMANA), n)],
+        'feriado': (rng.random(n) < 0.05).astype(np.int64),
+        'temperatura_media': rng.uniform(15, 35, n),
+        'concorrente_em_promocao': rng.integers(0, 2, n),
+    })
+
+    efeito_preco = (200 - df['preco_produto']) * 0.8
+    efeito_mkt = np.log(df['investimento_marketing']) * 10
+    efeito_fds = df['dia_semana'].isin(['Sab', 'Dom']).astype(int) * 30
+    efeito_temp = (35 - df['temperatura_media']) * 2
+    demanda_real = 100 + efeito_preco + efeito_mkt + efeito_fds + efeito_temp + rng.normal(0, 15, n)
+    df['unidades_vendidas'] = np.maximum(0, demanda_real).astype(np.int64)
+    return df
+
+
+# Média teórica do score de compra (no original vem de score.mean() da base toda;
+# num gerador em chunks usamos a esperança, para o chunk não depender dos outros)
+_MEDIA_SCORE_PROPENSAO = 14.5 * 0.5 + (304.5 / 60) + 0.2 * 10 + 0.3 * 5
+
+
+def gerar_chunk_propensao(n, rng, id_inicial=1):
+    # Espelha sales_propensity_model.py
+    df = pd.DataFrame({
+        'id_cliente': np.arange(id_inicial, id_inicial + n, dtype=np.int64),
+        'visitas_site_ultimo_mes': rng.integers(0, 30, n),
+        'tempo_medio_pagina_seg': rng.integers(10, 600, n),
+        'adicionou_carrinho_abandonou': (rng.random(n) < 0.3).astype(np.int64),
+        'dispositivo': _DISPOSITIVOS[rng.integers(0, len(_DISPOSITIVOS), n)],
+        'comprou_colecao_anterior': (rng.random(n) < 0.2).astype(np.int64),
+    })
+
+    score_compra = (
+        (df['visitas_site_ultimo_mes'] * 0.5) +
+        (df['tempo_medio_pagina_seg'] / 60) +
+        (df['comprou_colecao_anterior'] * 10) +
+        (df['adicionou_carrinho_abandonou'] * 5)
+    )
+    probabilidade = 1 / (1 + np.exp(-(score_compra - _MEDIA_SCORE_PROPENSAO) / 5))
+    df['comprou'] = rng.binomial(1, probabilidade)
+    return df
+
+
+GERADORES = {
+    'churn': gerar_chunk_churn,
+    'transacoes': gerar_chunk_transacoes,
+    'demanda': gerar_chunk_demanda,
+    'propensao': gerar_chunk_propensao,
+}
+
+
+# ==============================================================================
+# 2. ORQUESTRAÇÃO (CHUNKS EM PARALELO -> PARQUET PARTICIONADO)
+# ==============================================================================
+def gerar_chunk(nome, indice_chunk, n_linhas, tamanho_chunk=TAMANHO_CHUNK, semente=SEMENTE, **kwargs):
+    # Semente por chunk: reprodutível e independente da ordem de execução
+    rng = np.random.default_rng([semente, indice_chunk])
+    inicio = indice_chunk * tamanho_chunk
+    n = min(tamanho_chunk, n_linhas - inicio)
+    if nome == 'transacoes':
+        # Universo de clientes vem do TOTAL da base (não do chunk) e é o mesmo em
+        # todos os chunks: senão cada parte teria sua própria faixa de ids
+        if kwargs.get('n_clientes') is None:
+            kwargs['n_clientes'] = max(1, n_linhas // 10)
+        return GERADORES[nome](n, rng, **kwargs)
+    return GERADORES[nome](n, rng, id_inicial=inicio + 1, **kwargs)
+
+
+def _gerar_e_salvar_parte(nome, indice_chunk, n_linhas, pasta_saida, tamanho_chunk, semente, kwargs):
+    df = gerar_chunk(nome, indice_chunk, n_linhas, tamanho_chunk, semente, **kwargs)
+    caminho = os.path.join(pasta_saida, f'parte-{indice_chunk:05d}.parquet')
+    df.to_parquet(caminho, index=False)
+    return caminho
+
+
+def gerar_dataset(nome, n_linhas, pasta_saida, tamanho_chunk=TAMANHO_CHUNK, semente=SEMENTE, n_jobs=-1, **kwargs):
+    os.makedirs(pasta_saida, exist_ok=True)
+    n_chunks = math.ceil(n_linhas / tamanho_chunk)
+    print(f"🏭 Gerando '{nome}': {n_linhas:,} linhas em {n_chunks} partes -> {pasta_saida}")
+
+    caminhos = Parallel(n_jobs=n_jobs)(
+        delayed(_gerar_e_salvar_parte)(nome, i, n_linhas, pasta_saida, tamanho_chunk, semente, kwargs)
+        for i in range(n_chunks)
+    )
+    print(f"✅ Dataset '{nome}' pronto ({n_chunks} arquivos Parquet)")
+    return caminhos
+
+
+def gerar_em_memoria(nome, n_linhas, tamanho_chunk=TAMANHO_CHUNK, semente=SEMENTE, **kwargs):
+    # Atalho para bases que cabem na RAM (mesmos dados que gerar_dataset grava em disco)
+    n_chunks = math.ceil(n_linhas / tamanho_chunk)
+    partes = [gerar_chunk(nome, i, n_linhas, tamanho_chunk, semente, **kwargs) for i in range(n_chunks)]
+    return pd.concat(partes, ignore_index=True)
+
+
+def ler_dataset_em_chunks(pasta, colunas=None):
+    # Lê o dataset particionado uma parte de cada vez (memória limitada ao tamanho do chunk)
+    for arquivo in sorted(os.listdir(pasta)):
+        if arquivo.endswith('.parquet'):
+            yield pd.read_parquet(os.path.join(pasta, arquivo), columns=colunas)
+
+
+if __name__ == "__main__":
+    # Exemplo: 10 milhões de clientes para o teste de carga do churn
+    gerar_dataset('churn', 10_000_000, 'dados_sinteticos/churn')
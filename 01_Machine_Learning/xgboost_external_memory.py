@@ -0,0 +1,118 @@
+import os
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.metrics import roc_auc_score, mean_squared_error
+
+from retail_pipelines import (construir_preprocessor_churn, construir_preprocessor_demanda,
+                              CHURN_TARGET, DEMANDA_TARGET)
+from synthetic_data_factory import gerar_dataset
+
+# ==============================================================================
+# 💽 TREINO DO XGBOOST EM CHUNKS (BASES MAIORES QUE A RAM)
+# ==============================================================================
+# No script, o XGBoost recebe um DataFrame inteiro já transformado pelo
+# ColumnTransformer. Aqui o XGBoost "puxa" os dados chunk a chunk por um iterador:
+# - QuantileDMatrix: lê os chunks, monta os histogramas (hist) e guarda só a
+#   versão compacta (bins) na RAM;
+# - ExtMemQuantileDMatrix: nem isso fica na RAM, as páginas vão para um cache em disco.
+# O pré-processamento é o MESMO do script, aplicado chunk a chunk.
+
+PASTA_CACHE = 'cache_xgboost'
+
+PARAMS_CHURN = {
+    'objective': 'binary:logistic',
+    'eta': 0.1,
+    'scale_pos_weight': 5,
+    'tree_method': 'hist',
+    'eval_metric': 'auc',
+    'seed': 42,
+}
+
+PARAMS_DEMANDA = {
+    'objective': 'reg:squarederror',
+    'eta': 0.1,
+    'tree_method': 'hist',
+    'eval_metric': 'rmse',
+    'seed': 42,
+}
+
+
+class IteradorChunks(xgb.DataIter):
+    # O XGBoost chama next() até receber False e reset() a cada nova passada.
+    # fonte_chunks é uma função que devolve um gerador NOVO de DataFrames.
+    def __init__(self, fonte_chunks, preprocessor, coluna_alvo, cache_prefix=None):
+        self.fonte_chunks = fonte_chunks
+        self.preprocessor = preprocessor
+        self.coluna_alvo = coluna_alvo
+        self._chunks = None
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data):
+        if self._chunks is None:
+            self._chunks = self.fonte_chunks()
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            return False
+        X = self.preprocessor.transform(chunk.drop(columns=[self.coluna_alvo]))
+        input_data(data=X, label=chunk[self.coluna_alvo].to_numpy())
+        return True
+
+    def reset(self):
+        self._chunks = None
+
+
+def treinar_em_chunks(fonte_chunks, preprocessor, coluna_alvo, params, num_boost_round=100,
+                      memoria_externa=True, pasta_cache=PASTA_CACHE, max_bin=256):
+    # 1. Estatísticas do pré-processamento (medianas, médias, categorias) vêm do
+    #    primeiro chunk: é uma amostra grande o bastante e cabe na memória.
+    primeiro_chunk = next(fonte_chunks())
+    preprocessor.fit(primeiro_chunk.drop(columns=[coluna_alvo]))
+
+    # 2. Matriz quantizada alimentada pelo iterador
+    if memoria_externa:
+        os.makedirs(pasta_cache, exist_ok=True)
+        iterador = IteradorChunks(fonte_chunks, preprocessor, coluna_alvo,
+                                  cache_prefix=os.path.join(pasta_cache, 'pagina'))
+        dtrain = xgb.ExtMemQuantileDMatrix(iterador, max_bin=max_bin)
+    else:
+        iterador = IteradorChunks(fonte_chunks, preprocessor, coluna_alvo)
+        dtrain = xgb.QuantileDMatrix(iterador, max_bin=max_bin)
+
+    # 3. Treino histograma (tree_method='hist' é obrigatório nesses dois formatos)
+    booster = xgb.train({**params, 'tree_method': 'hist', 'max_bin': max_bin}, dtrain,
+                        num_boost_round=num_boost_round)
+    return preprocessor, booster
+
+
+def prever(preprocessor, booster, df, coluna_alvo):
+    X = preprocessor.transform(df.drop(columns=[coluna_alvo], errors='ignore'))
+    return booster.inplace_predict(X)
+
+
+def _fonte_partes(arquivos, descartar=()):
+    # Devolve a "fábrica de geradores" que o IteradorChunks precisa (um gerador novo por passada)
+    return lambda: (pd.read_parquet(arquivo).drop(columns=list(descartar)) for arquivo in arquivos)
+
+
+if __name__ == "__main__":
+    # Demonstração: bases particionadas geradas pela fábrica, treino sem carregar tudo.
+    # A última parte fica de fora do treino para servir de teste.
+    arquivos_churn = gerar_dataset('churn', 2_000_000, 'dados_sinteticos/churn', tamanho_chunk=250_000)
+    arquivos_demanda = gerar_dataset('demanda', 2_000_000, 'dados_sinteticos/demanda', tamanho_chunk=250_000)
+
+    print("\n⚙️ Treinando CHURN em memória externa (ExtMemQuantileDMatrix)...")
+    prep_churn, booster_churn = treinar_em_chunks(
+        _fonte_partes(arquivos_churn[:-1], descartar=['id_cliente']),
+        construir_preprocessor_churn(), CHURN_TARGET, PARAMS_CHURN)
+    teste_churn = pd.read_parquet(arquivos_churn[-1])
+    proba = prever(prep_churn, booster_churn, teste_churn.drop(columns=['id_cliente']), CHURN_TARGET)
+    print(f"✅ ROC-AUC (parte de teste): {roc_auc_score(teste_churn[CHURN_TARGET], proba):.4f}")
+
+    print("\n⚙️ Treinando DEMANDA em QuantileDMatrix (só os bins na RAM)...")
+    prep_dem, booster_dem = treinar_em_chunks(
+        _fonte_partes(arquivos_demanda[:-1]),
+        construir_preprocessor_demanda(), DEMANDA_TARGET, PARAMS_DEMANDA, memoria_externa=False)
+    teste_dem = pd.read_parquet(arquivos_demanda[-1])
+    pred = prever(prep_dem, booster_dem, teste_dem, DEMANDA_TARGET)
+    print(f"✅ RMSE (parte de teste): {np.sqrt(mean_squared_error(teste_dem[DEMANDA_TARGET], pred)):.2f} unidades")
@@ -3,6 +3,7 @@ import pandas as pd
 import chromadb
 import time
 import os
+import hashlib
 
 # ==============================================================================
 # ⚙️ CONFIGURAÇÃO DE ENGENHARIA
@@ -18,6 +19,103 @@ genai.configure(api_key=MINHA_API_KEY)
 chroma_client = chromadb.PersistentClient(path="banco_vetorial_jp_modas")
 collection = chroma_client.get_or_create_collection(name="estoque_vip_jp_modas")
 
+# ==============================================================================
+# 🔍 DIFF EM MASSA (CSV x BANCO) - SEM UMA CONSULTA POR PRODUTO
+# ==============================================================================
+# Antes: collection.get(ids=[id]) para CADA linha do CSV (1M produtos = 1M idas
+# ao Chroma só para descobrir que quase nada mudou). Agora:
+# 1. Lemos do banco, em páginas, só os IDs + metadados (inclui o hash do texto);
+# 2. Cruzamos com o CSV de uma vez (merge do pandas);
+# 3. Só o que mudou gasta alguma coisa:
+#    - Produto novo ou texto alterado -> gera embedding e faz upsert (gasta API);
+#    - Só o preço mudou               -> atualiza metadados (sem API);
+#    - Sumiu do CSV                   -> apaga do banco.
+TAMANHO_LOTE = 50          # Textos por chamada de embedding (o segredo da economia)
+TAMANHO_PAGINA = 10_000    # IDs por ida ao Chroma (leitura, atualização e remoção)
+TENTATIVAS_API = 3
+
+
+def montar_texto(df):
+    return df['nome'].astype(str) + " - " + df['categoria'].astype(str) + " - " + df['descricao'].astype(str)
+
+
+def calcular_hash(textos):
+    # Impressão digital do texto: se não mudou, o embedding também não muda
+    return [hashlib.md5(texto.encode('utf-8')).hexdigest() for texto in textos]
+
+
+def ler_estado_banco(tamanho_pagina=TAMANHO_PAGINA):
+    # Uma passada paginada no banco inteiro: id -> (hash, preço, categoria)
+    linhas = []
+    offset = 0
+    while True:
+        pagina = collection.get(include=['metadatas'], limit=tamanho_pagina, offset=offset)
+        if not pagina['ids']:
+            break
+        for id_str, meta in zip(pagina['ids'], pagina['metadatas']):
+            meta = meta or {}
+            linhas.append((id_str, meta.get('hash_texto'), meta.get('preco'), meta.get('categoria')))
+        offset += len(pagina['ids'])
+
+    estado = pd.DataFrame(linhas, columns=['id_str', 'hash_banco', 'preco_banco', 'categoria_banco'])
+    estado['hash_salvo'] = estado['hash_banco'].notna()
+
+    # Itens gravados antes do hash existir: calcula a partir do documento salvo (migração, uma vez só)
+    sem_hash = estado.index[estado['hash_banco'].isna()]
+    for inicio in range(0, len(sem_hash), tamanho_pagina):
+        indices = sem_hash[inicio:inicio + tamanho_pagina]
+        docs = collection.get(ids=estado.loc[indices, 'id_str'].tolist(), include=['documents'])
+        hashes = dict(zip(docs['ids'], calcular_hash(d or '' for d in docs['documents'])))
+        estado.loc[indices, 'hash_banco'] = estado.loc[indices, 'id_str'].map(hashes)
+    return estado
+
+
+def calcular_diff(df, estado):
+    df = df.assign(id_str=df['id'].astype(str), texto=montar_texto(df))
+    df['hash_texto'] = calcular_hash(df['texto'])
+    cruzado = df.merge(estado, on='id_str', how='outer', indicator=True)
+
+    existe = cruzado['_merge'] == 'both'
+    texto_mudou = existe & (cruzado['hash_texto'] != cruzado['hash_banco'])
+    meta_mudou = existe & ~texto_mudou & (
+        (cruzado['preco'].astype(float) != cruzado['preco_banco'].astype(float))
+        | (cruzado['categoria'].astype(str) != cruzado['categoria_banco'].astype(str))
+        | cruzado['hash_salvo'].eq(False)                      # Grava o hash dos itens antigos
+    )
+    return {
+        'embeddar': cruzado[(cruzado['_merge'] == 'left_only') | texto_mudou],
+        'atualizar_meta': cruzado[meta_mudou],
+        'remover': cruzado.loc[cruzado['_merge'] == 'right_only', 'id_str'].tolist(),
+        'n_novos': int((cruzado['_merge'] == 'left_only').sum()),
+        'n_texto_mudou': int(texto_mudou.sum()),
+    }
+
+
+def _metadados(linhas):
+    return [{"preco": float(p), "categoria": c, "hash_texto": h}
+            for p, c, h in zip(linhas['preco'], linhas['categoria'], linhas['hash_texto'])]
+
+
+def _enviar_lote(lote):
+    for tentativa in range(1, TENTATIVAS_API + 1):
+        try:
+            # Gera os vetores do lote inteiro de uma vez só
+            resultado = genai.embed_content(model=MODELO_EMBEDDING, content=lote['texto'].tolist())
+            # upsert: insere os novos e sobrescreve os que mudaram de texto
+            collection.upsert(
+                ids=lote['id_str'].tolist(),
+                documents=lote['texto'].tolist(),
+                embeddings=resultado['embedding'],
+                metadatas=_metadados(lote)
+            )
+            return True
+        except Exception as e:
+            print(f"\n❌ Erro no lote (tentativa {tentativa}/{TENTATIVAS_API}): {e}")
+            print("⏳ Esperando 30s por segurança...")
+            time.sleep(30)
+    return False
+
+
 # ==============================================================================
 # 📥 PROCESSO DE CARGA (BATCH / LOTES)
 # ==============================================================================
@@ -41,68 +139,41 @@ def executar_etl():
     print(f"📊 Total no CSV: {total_csv}")
     print(f"💾 Total já no Banco: {collection.count()}")
 
-    if collection.count() < total_csv:
-        print(f"🚀 Iniciando processamento em LOTES DE 50 (Economia de API)...")
-        
-        ids_lote, docs_lote, meta_lote = [], [], []
-        TAMANHO_LOTE = 50 # O segredo da economia
-        
-        for index, row in df.iterrows():
-            id_str = str(row['id'])
-            
-            # Checagem rápida local (não gasta API)
-            if len(collection.get(ids=[id_str])['ids']) > 0:
-                continue
-
-            # Prepara dados
-            texto_produto = f"{row['nome']} - {row['categoria']} - {row['descricao']}"
-            
-            ids_lote.append(id_str)
-            docs_lote.append(texto_produto)
-            meta_lote.append({"preco": float(row['preco']), "categoria": row['categoria']})
-            
-            # --- DISPARA A API SÓ QUANDO O LOTE ENCHE ---
-            if len(ids_lote) >= TAMANHO_LOTE:
-                try:
-                    print(f"⚡ Enviando lote de {len(ids_lote)} itens...", end='\r')
-                    
-                    # Gera 50 vetores de uma vez só
-                    resultado = genai.embed_content(
-                        model=MODELO_EMBEDDING,
-                        content=docs_lote
-                    )
-                    
-                    # Salva no ChromaDB
-                    collection.add(
-                        ids=ids_lote,
-                        documents=docs_lote,
-                        embeddings=resultado['embedding'],
-                        metadatas=meta_lote
-                    )
-                    
-                    print(f"✅ Lote salvo! Progresso: {index+1}/{total_csv}      ")
-                    
-                    # Reseta listas e descansa a API
-                    ids_lote, docs_lote, meta_lote = [], [], []
-                    time.sleep(2) 
-                    
-                except Exception as e:
-                    print(f"\n❌ Erro no lote: {e}")
-                    print("⏳ Esperando 30s por segurança...")
-                    time.sleep(30)
-
-        # Processa o último lote (se sobrou algo)
-        if ids_lote:
-            try:
-                print("⚡ Salvando lote final...")
-                res = genai.embed_content(model=MODELO_EMBEDDING, content=docs_lote)
-                collection.add(ids=ids_lote, documents=docs_lote, embeddings=res['embedding'], metadatas=meta_lote)
-                print("✅ ETL CONCLUÍDO COM SUCESSO!")
-            except Exception as e:
-                print(f"Erro final: {e}")
-
-    else:
+    # 2. Diff em massa: uma leitura paginada do banco, nenhuma consulta por linha
+    diff = calcular_diff(df, ler_estado_banco())
+    embeddar, atualizar_meta, remover = diff['embeddar'], diff['atualizar_meta'], diff['remover']
+    print(f"🔍 Novos: {diff['n_novos']} | Texto alterado: {diff['n_texto_mudou']} | "
+          f"Só preço/metadados: {len(atualizar_meta)} | Removidos do CSV: {len(remover)}")
+
+    if embeddar.empty and atualizar_meta.empty and not remover:
         print("⚡ O banco já está 100% atualizado. Nenhuma ação necessária.")
+        return
+
+    # 3. Novos + texto alterado: embeddings em LOTES DE 50 (Economia de API)
+    if not embeddar.empty:
+        print(f"🚀 Iniciando processamento em LOTES DE {TAMANHO_LOTE} (Economia de API)...")
+        falhas = 0
+        for inicio in range(0, len(embeddar), TAMANHO_LOTE):
+            lote = embeddar.iloc[inicio:inicio + TAMANHO_LOTE]
+            print(f"⚡ Enviando lote de {len(lote)} itens...", end='\r')
+            if _enviar_lote(lote):
+                print(f"✅ Lote salvo! Progresso: {inicio + len(lote)}/{len(embeddar)}      ")
+            else:
+                falhas += len(lote)   # Fica de fora: o próximo ETL encontra de novo no diff
+            time.sleep(2)             # Descansa a API
+        if falhas:
+            print(f"⚠️ {falhas} itens não foram enviados (serão tentados na próxima execução)")
+
+    # 4. Só metadados mudaram: atualiza sem gastar API
+    for inicio in range(0, len(atualizar_meta), TAMANHO_PAGINA):
+        pagina = atualizar_meta.iloc[inicio:inicio + TAMANHO_PAGINA]
+        collection.update(ids=pagina['id_str'].tolist(), metadatas=_metadados(pagina))
+
+    # 5. Produtos que saíram do catálogo
+    for inicio in range(0, len(remover), TAMANHO_PAGINA):
+        collection.delete(ids=remover[inicio:inicio + TAMANHO_PAGINA])
+
+    print(f"✅ ETL CONCLUÍDO COM SUCESSO! Total no Banco: {collection.count()}")
 
 if __name__ == "__main__":
     executar_etl()
\ No newline at end of file
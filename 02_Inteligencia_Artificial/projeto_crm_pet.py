@@ -2,6 +2,10 @@ import google.generativeai as genai
 import pandas as pd
 from datetime import datetime
 
+# Motor de regras compartilhado com a segmentação K-Means (pacote varejo_comum, na raiz:
+# pip install -e . uma vez)
+from varejo_comum import compilar_regras
+
 # --- CONFIGURAÇÃO ---
 MINHA_API_KEY = "INSIRA_SUA_CHAVE_AQUI"
 genai.configure(api_key=MINHA_API_KEY)
@@ -36,19 +40,17 @@ try:
     df['dias_sem_comprar'] = (hoje - df['data_ultima_compra']).dt.days
 
     # --- LÓGICA DE SEGMENTAÇÃO RFM (Simplificada) ---
-    def classificar_cliente(row):
-        if row['dias_sem_comprar'] > 90:
-            return "Churn (Perdido)"
-        elif row['dias_sem_comprar'] > 30 and row['qtde_compras'] > 5:
-            return "Risco de Abandono (Urgente)" # Era fiel e parou
-        elif row['qtde_compras'] == 1 and row['dias_sem_comprar'] < 30:
-            return "Novo Cliente"
-        elif row['qtde_compras'] > 10:
-            return "Campeão (Vip)"
-        else:
-            return "Cliente Recorrente"
+    # Regras em ordem: a primeira que bate vence (igual a um if/elif).
+    # Rodam na coluna inteira de uma vez (np.select), sem .apply linha a linha.
+    REGRAS_CRM = [
+        ("Churn (Perdido)", [('dias_sem_comprar', '>', 90)]),
+        ("Risco de Abandono (Urgente)", [('dias_sem_comprar', '>', 30), ('qtde_compras', '>', 5)]), # Era fiel e parou
+        ("Novo Cliente", [('qtde_compras', '==', 1), ('dias_sem_comprar', '<', 30)]),
+        ("Campeão (Vip)", [('qtde_compras', '>', 10)]),
+    ]
+    classificar_cliente = compilar_regras(REGRAS_CRM, padrao="Cliente Recorrente")
 
-    df['status_crm'] = df.apply(classificar_cliente, axis=1)
+    df['status_crm'] = classificar_cliente(df)
     
     print("\n📋 CLASSIFICAÇÃO DA CARTEIRA:")
     print(df[['nome_cliente', 'dias_sem_comprar', 'produto_favorito', 'status_crm']])
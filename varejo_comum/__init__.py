@@ -0,0 +1,3 @@
+# Código compartilhado entre 01_Machine_Learning e 02_Inteligencia_Artificial.
+# Instale uma vez na raiz do repositório: pip install -e .
+from varejo_comum.segment_rules import compilar_regras, OPERADORES
@@ -0,0 +1,129 @@
+import operator
+import numpy as np
+
+# ==============================================================================
+# 📐 MOTOR DE REGRAS DE SEGMENTAÇÃO (SEM .apply LINHA A LINHA)
+# ==============================================================================
+# As regras de negócio (VIP, Em Risco, Churn...) eram funções Python aplicadas
+# com df.apply(axis=1): uma chamada por cliente. Aqui as regras viram DADOS:
+# uma lista ORDENADA de (rótulo, condições). A primeira regra que bate vence,
+# exatamente como a cadeia de if/elif. Tudo é compilado para um np.select,
+# que avalia cada condição na coluna inteira de uma vez.
+#
+# Exemplo:
+#   REGRAS = [
+#       ("Churn", [('dias_sem_comprar', '>', 90)]),
+#       ("Risco", [('dias_sem_comprar', '>', 30), ('qtde_compras', '>', 5)]),  # E lógico
+#   ]
+#   classificar = compilar_regras(REGRAS, padrao="Recorrente")
+#   df['status'] = classificar(df)
+
+OPERADORES = {
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+
+
+def compilar_regras(regras, padrao):
+    # Valida tudo na compilação: erro de digitação aparece antes de rodar na base
+    for rotulo, condicoes in regras:
+        for coluna, simbolo, _ in condicoes:
+            if simbolo not in OPERADORES:
+                raise ValueError(f"Operador '{simbolo}' inválido na regra '{rotulo}' (coluna '{coluna}')")
+
+    rotulos = [rotulo for rotulo, _ in regras]
+
+    def classificar(df):
+        mascaras = []
+        for _, condicoes in regras:
+            mascara = np.ones(len(df), dtype=bool)
+            for coluna, simbolo, valor in condicoes:
+                # Comparação com nulo dá False, igual ao if/elif com NaN
+                mascara &= np.asarray(OPERADORES[simbolo](df[coluna], valor), dtype=bool)
+            mascaras.append(mascara)
+        return np.select(mascaras, rotulos, default=padrao) if mascaras else np.full(len(df), padrao)
+
+    return classificar
+
+
+if __name__ == "__main__":
+    # Benchmark: regras compiladas x funções originais com .apply (mesmos rótulos?)
+    import time
+    import pandas as pd
+
+    def classificar_cliente(row):
+        # Cópia fiel da função original do projeto_crm_pet.py
+        if row['dias_sem_comprar'] > 90:
+            return "Churn (Perdido)"
+        elif row['dias_sem_comprar'] > 30 and row['qtde_compras'] > 5:
+            return "Risco de Abandono (Urgente)"
+        elif row['qtde_compras'] == 1 and row['dias_sem_comprar'] < 30:
+            return "Novo Cliente"
+        elif row['qtde_compras'] > 10:
+            return "Campeão (Vip)"
+        else:
+            return "Cliente Recorrente"
+
+    def nomear_cluster(row):
+        # Cópia fiel da função original do customer_segmentation_kmeans.py
+        r = row['Media_Dias_Sem_Comprar']
+        f = row['Media_Compras_Ano']
+        m = row['Media_Gasto_Total']
+        if m > 2500:
+            return "💎 CAMPEÕES (VIPs)"
+        elif r > 90 and m > 1000:
+            return "⚠️ EM RISCO (Gastavam bem e sumiram)"
+        elif r > 90:
+            return "💤 HIBERNANDO"
+        elif f > 5:
+            return "🌱 PROMESSAS (Novos e ativos)"
+        else:
+            return "👤 CLIENTE PADRÃO"
+
+    REGRAS_CLUSTER = [
+        ("💎 CAMPEÕES (VIPs)", [('Media_Gasto_Total', '>', 2500)]),
+        ("⚠️ EM RISCO (Gastavam bem e sumiram)", [('Media_Dias_Sem_Comprar', '>', 90), ('Media_Gasto_Total', '>', 1000)]),
+        ("💤 HIBERNANDO", [('Media_Dias_Sem_Comprar', '>', 90)]),
+        ("🌱 PROMESSAS (Novos e ativos)", [('Media_Compras_Ano', '>', 5)]),
+    ]
+
+    REGRAS_CRM = [
+        ("Churn (Perdido)", [('dias_sem_comprar', '>', 90)]),
+        ("Risco de Abandono (Urgente)", [('dias_sem_comprar', '>', 30), ('qtde_compras', '>', 5)]),
+        ("Novo Cliente", [('qtde_compras', '==', 1), ('dias_sem_comprar', '<', 30)]),
+        ("Campeão (Vip)", [('qtde_compras', '>', 10)]),
+    ]
+
+    def comparar(nome, funcao_original, regras, padrao, df):
+        inicio = time.perf_counter()
+        esperado = df.apply(funcao_original, axis=1).to_numpy()
+        tempo_apply = time.perf_counter() - inicio
+
+        classificar = compilar_regras(regras, padrao)
+        inicio = time.perf_counter()
+        obtido = classificar(df)
+        tempo_regras = time.perf_counter() - inicio
+
+        iguais = np.array_equal(esperado.astype(str), obtido.astype(str))
+        print(f"{nome:<15} | {len(df):>10,} linhas | apply: {tempo_apply:8.3f}s | regras: {tempo_regras:8.4f}s | "
+              f"{tempo_apply / tempo_regras:6.0f}x | rótulos idênticos: {iguais}")
+
+    rng = np.random.default_rng(42)
+    for n in [10_000, 100_000, 1_000_000]:
+        df_crm = pd.DataFrame({
+            'dias_sem_comprar': rng.integers(0, 200, n).astype(float),
+            'qtde_compras': rng.integers(1, 20, n),
+        })
+        df_crm.loc[rng.random(n) < 0.01, 'dias_sem_comprar'] = np.nan  # Data inválida (errors='coerce')
+        comparar('CRM Pet', classificar_cliente, REGRAS_CRM, "Cliente Recorrente", df_crm)
+
+        df_grupos = pd.DataFrame({
+            'Media_Dias_Sem_Comprar': rng.uniform(0, 200, n),
+            'Media_Compras_Ano': rng.uniform(1, 20, n),
+            'Media_Gasto_Total': rng.exponential(1500, n),
+        })
+        comparar('Perfil Cluster', nomear_cluster, REGRAS_CLUSTER, "👤 CLIENTE PADRÃO", df_grupos)